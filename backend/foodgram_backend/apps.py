@@ -0,0 +1,22 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.contrib.admin.apps import SimpleAdminConfig
+from django.utils.module_loading import module_has_submodule
+
+# Приложения, чей admin.py ничего не регистрирует, а только дорого
+# импортируется: import_export.admin тянет tablib, openpyxl, xlrd и odf
+# (~140 мс на старте воркера). Его загружает recipes.admin_import при
+# открытии страницы импорта.
+ADMIN_AUTODISCOVER_SKIP = ('import_export',)
+
+
+class AdminConfig(SimpleAdminConfig):
+    """django.contrib.admin с autodiscover без ADMIN_AUTODISCOVER_SKIP."""
+
+    def ready(self):
+        super().ready()
+        for app_config in apps.get_app_configs():
+            if (app_config.name not in ADMIN_AUTODISCOVER_SKIP
+                    and module_has_submodule(app_config.module, 'admin')):
+                import_module(f'{app_config.name}.admin')
@@ -0,0 +1,132 @@
+"""
+Общие инструменты асинхронных read-only view для ASGI.
+
+Асинхронный view обслуживает только типовой успешный GET. Всё
+остальное (другие методы, браузерный API, sparse fields, ошибки
+валидации, 404 и 401) передаётся синхронному view DRF, поэтому ответы
+с ошибками полностью совпадают с WSGI-версией.
+"""
+from math import ceil
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from users.authentication import CachedTokenAuthentication
+
+from .pagination import LimitPageNumberPagination
+from .renderers import ORJSONRenderer
+
+# Параметры, которые поддерживает только синхронная реализация.
+SYNC_ONLY_PARAMS = frozenset(('fields', 'omit', 'facets', 'format'))
+
+
+class Delegate(Exception):
+    """Запрос нужно отдать синхронному view."""
+
+
+def async_get(async_view, sync_view):
+    """Асинхронный GET с откатом на синхронный view DRF."""
+    sync_view = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if (request.method == 'GET'
+                and 'text/html' not in request.headers.get('Accept', '')
+                and not SYNC_ONLY_PARAMS.intersection(request.GET)):
+            try:
+                return await async_view(request, *args, **kwargs)
+            except Delegate:
+                pass
+        return await sync_view(request, *args, **kwargs)
+
+    # Как и у view DRF: CSRF проверяет только SessionAuthentication.
+    view.csrf_exempt = True
+    return view
+
+
+async def get_user(request):
+    """
+    Пользователь по токену или None; неверный токен — Delegate.
+    DRF проверяет токен на любом view, даже открытом для всех.
+    """
+    if 'HTTP_AUTHORIZATION' not in request.META:
+        return None
+    try:
+        result = await sync_to_async(
+            CachedTokenAuthentication().authenticate
+        )(request)
+    except AuthenticationFailed:
+        raise Delegate
+    return result[0] if result else None
+
+
+def get_values_serializer(serializer_class, request, viewer):
+    """
+    ValuesSerializer синхронных view для пользователя из get_user().
+    serialize() обращается к кешу и базе, его вызывают через
+    sync_to_async.
+    """
+    request.user = viewer or AnonymousUser()
+    return serializer_class(request)
+
+
+def get_router_views(router):
+    """Синхронные view роутера DRF по имени маршрута."""
+    views = {}
+    for pattern in router.urls:
+        views.setdefault(pattern.name, pattern.callback)
+    return views
+
+
+def json_response(data):
+    # Тот же рендерер, что у view DRF, чтобы тело совпадало байт в байт.
+    response = HttpResponse(
+        ORJSONRenderer().render(data), content_type='application/json'
+    )
+    response['Vary'] = 'Accept'
+    return response
+
+
+async def paginate(request, queryset, serialize):
+    """
+    Аналог LimitPageNumberPagination с асинхронными запросами.
+    serialize — синхронная функция, получающая строки всей страницы.
+    """
+    pagination = LimitPageNumberPagination
+    page_size = pagination.page_size
+    limit = request.GET.get(pagination.page_size_query_param)
+    if limit is not None:
+        if not limit.isdigit() or int(limit) == 0:
+            raise Delegate
+        page_size = min(int(limit), pagination.max_page_size)
+
+    count = await queryset.acount()
+    pages = max(ceil(count / page_size), 1)
+    number = request.GET.get(pagination.page_query_param, '1')
+    if number in pagination.last_page_strings:
+        number = str(pages)
+    if not number.isdigit() or not 1 <= int(number) <= pages:
+        raise Delegate
+    number = int(number)
+
+    offset = (number - 1) * page_size
+    results = await sync_to_async(serialize)(
+        [row async for row in queryset[offset:offset + page_size]]
+    )
+    url = request.build_absolute_uri()
+    previous = None
+    if number == 2:
+        previous = remove_query_param(url, pagination.page_query_param)
+    elif number > 2:
+        previous = replace_query_param(
+            url, pagination.page_query_param, number - 1
+        )
+    return {
+        'count': count,
+        'next': replace_query_param(
+            url, pagination.page_query_param, number + 1
+        ) if number < pages else None,
+        'previous': previous,
+        'results': results,
+    }
@@ -0,0 +1,168 @@
+"""Общие инструменты бенчмарков: замеры, перцентили и базовые значения."""
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import connection
+
+from .metrics import QueryTimer
+
+Scenario = namedtuple(
+    'Scenario', ('name', 'call', 'before', 'after'), defaults=(None, None)
+)
+
+# Замедлением считается рост p95 больше чем на threshold и одновременно
+# больше чем на столько миллисекунд (защита от шума).
+MIN_SLOWDOWN_MS = 1.0
+
+# То же, что делает воркер gunicorn до первого запроса. Последняя
+# строка вывода — время старта в мс и загруженные модули.
+STARTUP_CODE = (
+    'import time; started = time.perf_counter()\n'
+    'import django; django.setup()\n'
+    'from django.urls import get_resolver; get_resolver().url_patterns\n'
+    'elapsed = (time.perf_counter() - started) * 1000\n'
+    'import json, sys\n'
+    'print(json.dumps([elapsed, sorted(sys.modules)]))\n'
+)
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def summarize(durations, queries=None):
+    """Статистика по длительностям в секундах, результат в миллисекундах."""
+    stats = {
+        'p50': round(percentile(durations, 0.50) * 1000, 3),
+        'p95': round(percentile(durations, 0.95) * 1000, 3),
+        'p99': round(percentile(durations, 0.99) * 1000, 3),
+        'iterations': len(durations),
+    }
+    if queries is not None:
+        stats['queries'] = max(queries, default=0)
+    return stats
+
+
+def run_scenario(scenario, iterations, warmup=0):
+    """
+    Выполняет сценарий warmup + iterations раз. Время и SQL считаются
+    только для call, before и after выполняются вне замера.
+    """
+    durations = []
+    queries = []
+    for number in range(warmup + iterations):
+        if scenario.before:
+            scenario.before()
+        timer = QueryTimer()
+        with connection.execute_wrapper(timer):
+            start = time.perf_counter()
+            response = scenario.call()
+            elapsed = time.perf_counter() - start
+        if scenario.after:
+            scenario.after(response)
+        if response.status_code >= 400:
+            raise BenchmarkError(
+                f'{scenario.name}: ответ {response.status_code} '
+                f'{getattr(response, "data", b"")!r}'
+            )
+        if number >= warmup:
+            durations.append(elapsed)
+            queries.append(timer.count)
+    return summarize(durations, queries)
+
+
+def time_call(func, iterations, warmup=0):
+    """Длительности вызовов func() в секундах."""
+    for _ in range(warmup):
+        func()
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def find_regressions(results, baseline):
+    """
+    Сценарии, которым стало нужно больше SQL-запросов, чем в базовом
+    значении. Число запросов не зависит от машины, поэтому только оно
+    проверяется строго.
+    """
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if base is None or 'queries' not in base:
+            continue
+        if stats.get('queries', 0) > base['queries']:
+            regressions.append(
+                f'{name}: запросов {stats["queries"]} '
+                f'при бюджете {base["queries"]}'
+            )
+    return regressions
+
+
+def find_slowdowns(results, baseline, threshold):
+    """
+    Сценарии, у которых p95 вырос больше чем на threshold. Время зависит
+    от машины, на которой записаны базовые значения, поэтому это только
+    отчёт, а не ошибка.
+    """
+    slowdowns = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if base is None or 'p95' not in base:
+            continue
+        if (stats['p95'] > base['p95'] * (1 + threshold)
+                and stats['p95'] - base['p95'] > MIN_SLOWDOWN_MS):
+            slowdowns.append(
+                f'{name}: p95 {stats["p95"]} мс '
+                f'при базовом {base["p95"]} мс'
+            )
+    return slowdowns
+
+
+def measure_startup(*flags):
+    """
+    Холодный старт в отдельном процессе с флагами интерпретатора flags:
+    (время в мс, загруженные модули, stderr).
+    """
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+        'DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE
+    ))
+    process = subprocess.run(
+        [sys.executable, *flags, '-c', STARTUP_CODE],
+        capture_output=True, text=True, env=env, cwd=settings.BASE_DIR
+    )
+    if process.returncode:
+        raise BenchmarkError(process.stderr)
+    elapsed, modules = json.loads(process.stdout.strip().splitlines()[-1])
+    return elapsed, set(modules), process.stderr
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_baselines(path, baselines):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(baselines, file, ensure_ascii=False, indent=2,
+                  sort_keys=True)
+        file.write('\n')
@@ -1 +1,4 @@
 DEFAULT_PAGE_SIZE = 6
+API_PATH_PREFIX = '/api/'
+MEMBERSHIP_CACHE_PREFIX = 'memberships:v1'
+MEMBERSHIP_CACHE_TIMEOUT = 60 * 60
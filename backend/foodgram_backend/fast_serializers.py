@@ -0,0 +1,55 @@
+"""
+Сериализация ответов на чтение из строк .values() без экземпляров
+моделей и вложенных сериализаторов DRF. Результат совпадает с
+ModelSerializer байт в байт.
+"""
+from abc import ABC, abstractmethod
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.encoding import filepath_to_uri
+
+from .memberships import get_memberships
+
+
+def media_url_getter(request, field):
+    """
+    Функция «имя файла -> URL» для файлового поля, как
+    request.build_absolute_uri(file.url) в сериализаторах. Для
+    FileSystemStorage абсолютный префикс MEDIA_URL строится один раз.
+    """
+    storage = field.storage
+    if request is None:
+        return lambda name: storage.url(name) if name else None
+    if not isinstance(storage, FileSystemStorage):
+        return lambda name: (
+            request.build_absolute_uri(storage.url(name)) if name else None
+        )
+    prefix = request.build_absolute_uri(storage.base_url)
+    return lambda name: (
+        prefix + filepath_to_uri(name).lstrip('/') if name else None
+    )
+
+
+class ValuesSerializer(ABC):
+    """
+    Базовый класс: fields — колонки для .values(), serialize() —
+    список словарей ответа по списку строк. Подкласс без serialize()
+    нельзя создать.
+    """
+
+    fields = ()
+
+    def __init__(self, request):
+        self.request = request
+        user = getattr(request, 'user', None)
+        self.viewer = user if user and user.is_authenticated else None
+
+    def viewer_memberships(self, *memberships):
+        """Множества текущего пользователя (пустые для анонима)."""
+        if self.viewer is None:
+            return [frozenset()] * len(memberships)
+        return get_memberships(self.viewer.id, *memberships)
+
+    @abstractmethod
+    def serialize(self, rows):
+        """Список словарей ответа в порядке rows."""
@@ -0,0 +1,443 @@
+"""
+Нагрузочный генератор: виртуальные пользователи проигрывают сценарии
+из postman_collection (просмотр, фильтр по тегам, избранное, список
+покупок, подписки) против запущенного сервера.
+"""
+import http.client
+import json
+import random
+import socket
+import threading
+import time
+import uuid
+from collections import defaultdict
+from urllib.parse import urlencode, urlsplit
+
+from .benchmark import summarize
+
+PASSWORD = 'Loadtest-password-1'
+SESSION_WEIGHTS = {
+    'browse': 50,
+    'filter': 20,
+    'favorite': 10,
+    'cart': 10,
+    'subscribe': 10,
+}
+ERROR_SAMPLES = 5
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 3
+# Медленный клиент передаёт и читает данные порциями такого размера.
+SLOW_CLIENT_CHUNK = 16
+
+
+class Stats:
+    def __init__(self):
+        self.durations = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = defaultdict(list)
+        self.lock = threading.Lock()
+
+    def record(self, name, duration, error=None):
+        with self.lock:
+            self.durations[name].append(duration)
+            if error is not None:
+                self.errors[name] += 1
+                if len(self.error_samples[name]) < ERROR_SAMPLES:
+                    self.error_samples[name].append(error)
+
+    def report(self, elapsed):
+        endpoints = {}
+        with self.lock:
+            for name, durations in self.durations.items():
+                stats = summarize(durations)
+                stats.pop('iterations')
+                stats.update({
+                    'requests': len(durations),
+                    'errors': self.errors[name],
+                    'error_rate': round(self.errors[name] / len(durations), 4),
+                    'throughput': round(len(durations) / elapsed, 2),
+                    'max': round(max(durations) * 1000, 3),
+                })
+                if self.error_samples[name]:
+                    stats['error_samples'] = self.error_samples[name]
+                endpoints[name] = stats
+        requests = sum(stats['requests'] for stats in endpoints.values())
+        errors = sum(stats['errors'] for stats in endpoints.values())
+        return {
+            'totals': {
+                'requests': requests,
+                'errors': errors,
+                'error_rate': round(errors / requests, 4) if requests else 0,
+                'throughput': round(requests / elapsed, 2),
+            },
+            'endpoints': endpoints,
+        }
+
+
+class ApiClient:
+    """HTTP-клиент одного виртуального пользователя с keep-alive."""
+
+    def __init__(self, base_url, stats, timeout):
+        parts = urlsplit(base_url)
+        self.connection_class = (
+            http.client.HTTPSConnection if parts.scheme == 'https'
+            else http.client.HTTPConnection
+        )
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.stats = stats
+        self.timeout = timeout
+        self.token = None
+        self.connection = None
+
+    def request(self, method, path, name, params=None, body=None):
+        url = self.prefix + path
+        if params:
+            url += '?' + urlencode(params, doseq=True)
+        headers = {'Accept': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Token {self.token}'
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        if self.connection is None:
+            self.connection = self.connection_class(
+                self.netloc, timeout=self.timeout
+            )
+
+        start = time.perf_counter()
+        try:
+            self.connection.request(method, url, payload, headers)
+            response = self.connection.getresponse()
+            content = response.read()
+            # Списки тегов и ингредиентов со снимками каталога отдают
+            # 302 на статический файл: клиент идёт за ним, как браузер.
+            for _ in range(MAX_REDIRECTS):
+                if (method != 'GET'
+                        or response.status not in REDIRECT_STATUSES):
+                    break
+                response, content = self.follow(
+                    response.getheader('Location')
+                )
+        except (OSError, http.client.HTTPException) as error:
+            self.connection.close()
+            self.connection = None
+            self.stats.record(f'{method} {name}',
+                              time.perf_counter() - start, repr(error))
+            return None, None
+        duration = time.perf_counter() - start
+
+        error = None
+        if response.status >= 400:
+            error = '{} {}'.format(
+                response.status, content[:200].decode(errors='replace')
+            )
+        self.stats.record(f'{method} {name}', duration, error)
+        is_json = 'json' in (response.getheader('Content-Type') or '')
+        return response.status, json.loads(content) if is_json else None
+
+    def follow(self, location):
+        """GET по Location: тем же соединением, если хост тот же."""
+        parts = urlsplit(location)
+        path = parts.path + (f'?{parts.query}' if parts.query else '')
+        if parts.netloc in ('', self.netloc):
+            connection = self.connection
+        else:
+            connection = self.connection_class(
+                parts.netloc, timeout=self.timeout
+            )
+        try:
+            connection.request(
+                'GET', path, headers={'Accept': 'application/json'}
+            )
+            response = connection.getresponse()
+            return response, response.read()
+        finally:
+            if connection is not self.connection:
+                connection.close()
+
+
+class VirtualUser:
+
+    def __init__(self, client, rng, think_time):
+        self.client = client
+        self.rng = rng
+        self.think_time = think_time
+        self.user_id = None
+        self.tags = []
+        self.recipes = []
+        self.authors = []
+
+    def pause(self):
+        if self.think_time:
+            time.sleep(self.rng.expovariate(1 / self.think_time))
+
+    def get(self, path, name, params=None):
+        self.pause()
+        return self.client.request('GET', path, name, params)
+
+    def send(self, method, path, name, body=None):
+        self.pause()
+        return self.client.request(method, path, name, body=body)
+
+    def sign_up(self):
+        # Не из rng: повторный прогон с тем же seed не должен упираться
+        # в уже зарегистрированные адреса.
+        suffix = uuid.uuid4().hex[:16]
+        email = f'load-{suffix}@example.org'
+        status, data = self.send('POST', '/api/users/', '/api/users/', {
+            'email': email,
+            'username': f'load-{suffix}',
+            'first_name': 'Нагрузка',
+            'last_name': 'Тест',
+            'password': PASSWORD,
+        })
+        if status != 201:
+            return False
+        self.user_id = data['id']
+        status, data = self.send(
+            'POST', '/api/auth/token/login/', '/api/auth/token/login/',
+            {'email': email, 'password': PASSWORD}
+        )
+        if status != 200:
+            return False
+        self.client.token = data['auth_token']
+        return True
+
+    def log_out(self):
+        self.send('POST', '/api/auth/token/logout/',
+                  '/api/auth/token/logout/')
+
+    def remember(self, page):
+        if not page:
+            return
+        for recipe in page.get('results', []):
+            self.recipes.append(recipe['id'])
+            if recipe['author']['id'] != self.user_id:
+                self.authors.append(recipe['author']['id'])
+        del self.recipes[:-100]
+        del self.authors[:-100]
+
+    def pick_recipes(self, count):
+        unique = list(dict.fromkeys(self.recipes))
+        return self.rng.sample(unique, min(count, len(unique)))
+
+    def browse(self):
+        status, tags = self.get('/api/tags/', '/api/tags/')
+        if tags:
+            self.tags = [tag['slug'] for tag in tags]
+        _, page = self.get('/api/recipes/', '/api/recipes/',
+                           {'page': self.rng.randint(1, 3)})
+        self.remember(page)
+        for recipe_id in self.pick_recipes(2):
+            self.get(f'/api/recipes/{recipe_id}/', '/api/recipes/{id}/')
+        if self.authors:
+            author = self.rng.choice(self.authors)
+            self.get(f'/api/users/{author}/', '/api/users/{id}/')
+        self.get('/api/ingredients/', '/api/ingredients/?name=',
+                 {'name': self.rng.choice('абвгдекмпрс')})
+
+    def filter(self):
+        if not self.tags:
+            return self.browse()
+        tags = self.rng.sample(self.tags, min(2, len(self.tags)))
+        _, page = self.get('/api/recipes/', '/api/recipes/?tags=',
+                           {'tags': tags})
+        self.remember(page)
+
+    def favorite(self):
+        for recipe_id in self.pick_recipes(1):
+            path = f'/api/recipes/{recipe_id}/favorite/'
+            self.send('POST', path, '/api/recipes/{id}/favorite/')
+            self.get('/api/recipes/', '/api/recipes/?is_favorited=',
+                     {'is_favorited': 1})
+            self.send('DELETE', path, '/api/recipes/{id}/favorite/')
+
+    def cart(self):
+        recipes = self.pick_recipes(2)
+        for recipe_id in recipes:
+            self.send('POST', f'/api/recipes/{recipe_id}/shopping_cart/',
+                      '/api/recipes/{id}/shopping_cart/')
+        if recipes:
+            self.get('/api/recipes/download_shopping_cart/',
+                     '/api/recipes/download_shopping_cart/')
+        for recipe_id in recipes:
+            self.send('DELETE', f'/api/recipes/{recipe_id}/shopping_cart/',
+                      '/api/recipes/{id}/shopping_cart/')
+
+    def subscribe(self):
+        if not self.authors:
+            return
+        path = f'/api/users/{self.rng.choice(self.authors)}/subscribe/'
+        self.send('POST', path, '/api/users/{id}/subscribe/')
+        self.get('/api/users/subscriptions/', '/api/users/subscriptions/',
+                 {'recipes_limit': 3})
+        self.send('DELETE', path, '/api/users/{id}/subscribe/')
+
+
+def run_virtual_user(number, options, stats, deadline):
+    rng = random.Random(f'{options["seed"]}:{number}')
+    user = VirtualUser(
+        ApiClient(options['base_url'], stats, options['timeout']),
+        rng, options['think_time']
+    )
+    if not user.sign_up():
+        return
+    user.browse()
+    sessions = list(options['weights'])
+    weights = [options['weights'][name] for name in sessions]
+    while time.monotonic() < deadline:
+        getattr(user, rng.choices(sessions, weights)[0])()
+    user.log_out()
+
+
+def run_load(options):
+    """
+    Запускает options['concurrency'] виртуальных пользователей на
+    options['duration'] секунд, плавно добавляя их за ramp_up секунд.
+    """
+    stats = Stats()
+    started = time.time()
+    start = time.monotonic()
+    deadline = start + options['ramp_up'] + options['duration']
+    threads = []
+    for number in range(options['concurrency']):
+        thread = threading.Thread(
+            target=run_virtual_user,
+            args=(number, options, stats, deadline),
+            daemon=True
+        )
+        thread.start()
+        threads.append(thread)
+        if options['ramp_up']:
+            time.sleep(options['ramp_up'] / options['concurrency'])
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+
+    result = stats.report(elapsed)
+    result['meta'] = {
+        'base_url': options['base_url'],
+        'concurrency': options['concurrency'],
+        'duration': round(elapsed, 2),
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%SZ',
+                                    time.gmtime(started)),
+        'seed': options['seed'],
+        'think_time': options['think_time'],
+        'weights': options['weights'],
+    }
+    return result
+
+
+def compare(current, previous):
+    """Строки сравнения p95 и пропускной способности с прошлым прогоном."""
+    lines = []
+    old_endpoints = previous.get('endpoints', {})
+    for name, stats in sorted(current['endpoints'].items()):
+        old = old_endpoints.get(name)
+        if not old:
+            lines.append(f'{name}: новый')
+            continue
+        p95 = (
+            (stats['p95'] - old['p95']) / old['p95'] * 100
+            if old['p95'] else 0
+        )
+        lines.append(
+            f'{name}: p95 {old["p95"]} -> {stats["p95"]} мс ({p95:+.1f}%), '
+            f'ошибки {old["error_rate"]:.2%} -> {stats["error_rate"]:.2%}'
+        )
+    return lines
+
+
+def run_slow_client(base_url, path, delay, stop):
+    """
+    Клиент с медленной сетью: отправляет запрос и читает ответ по
+    SLOW_CLIENT_CHUNK байт с паузой delay, надолго занимая соединение.
+    """
+    parts = urlsplit(base_url)
+    request = (
+        f'GET {parts.path.rstrip("/")}{path} HTTP/1.1\r\n'
+        f'Host: {parts.netloc}\r\nConnection: close\r\n\r\n'
+    ).encode()
+    while not stop.is_set():
+        try:
+            with socket.create_connection(
+                (parts.hostname, parts.port or 80), timeout=delay + 30
+            ) as sock:
+                for offset in range(0, len(request), SLOW_CLIENT_CHUNK):
+                    sock.sendall(request[offset:offset + SLOW_CLIENT_CHUNK])
+                    if stop.wait(delay):
+                        return
+                while sock.recv(SLOW_CLIENT_CHUNK) and not stop.wait(delay):
+                    pass
+        except OSError:
+            stop.wait(delay)
+
+
+def run_fast_client(base_url, paths, stats, timeout, deadline):
+    client = ApiClient(base_url, stats, timeout)
+    while time.monotonic() < deadline:
+        for path in paths:
+            client.request('GET', path, path)
+
+
+def compare_servers(options):
+    """
+    Для каждого сервера из options['targets'] держит slow_clients
+    медленных соединений и замеряет запросы concurrency обычных
+    клиентов за duration секунд.
+    """
+    results = {}
+    for label, base_url in options['targets']:
+        stats = Stats()
+        stop = threading.Event()
+        slow = [
+            threading.Thread(
+                target=run_slow_client,
+                args=(base_url, options['paths'][number % len(
+                    options['paths']
+                )], options['slow_delay'], stop),
+                daemon=True
+            )
+            for number in range(options['slow_clients'])
+        ]
+        for thread in slow:
+            thread.start()
+        # Даём медленным клиентам занять соединения до начала замеров.
+        time.sleep(options['slow_delay'] * 2)
+
+        start = time.monotonic()
+        deadline = start + options['duration']
+        fast = [
+            threading.Thread(
+                target=run_fast_client,
+                args=(base_url, options['paths'], stats,
+                      options['timeout'], deadline),
+                daemon=True
+            )
+            for _ in range(options['concurrency'])
+        ]
+        for thread in fast:
+            thread.start()
+        for thread in fast:
+            thread.join()
+        elapsed = time.monotonic() - start
+        stop.set()
+        for thread in slow:
+            thread.join()
+        result = stats.report(elapsed)
+        overall = summarize([
+            duration
+            for durations in stats.durations.values()
+            for duration in durations
+        ])
+        for key in ('p50', 'p95', 'p99'):
+            result['totals'][key] = overall[key]
+        result['meta'] = {
+            'base_url': base_url,
+            'slow_clients': options['slow_clients'],
+            'slow_delay': options['slow_delay'],
+        }
+        results[label] = result
+    return results
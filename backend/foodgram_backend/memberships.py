@@ -0,0 +1,83 @@
+"""
+Множества id, связанных с пользователем (избранное, список покупок,
+подписки), в общем кеше. Отвечают на вопросы is_favorited,
+is_in_shopping_cart и is_subscribed без запросов к БД.
+
+Без общего кеша (CACHE_IS_SHARED) множества читаются из БД на каждый
+ответ: пересборка после записи дошла бы только до одного воркера.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .constants import MEMBERSHIP_CACHE_PREFIX, MEMBERSHIP_CACHE_TIMEOUT
+
+
+class Membership:
+    """Id объектов field из строк model, где user — пользователь."""
+
+    def __init__(self, name, model, field):
+        self.name = name
+        self.model = model
+        self.field = field
+
+    def get_key(self, user_id):
+        return f'{MEMBERSHIP_CACHE_PREFIX}:{self.name}:{user_id}'
+
+    def load(self, user_id):
+        return frozenset(self.model.objects.filter(
+            user_id=user_id
+        ).values_list(self.field, flat=True))
+
+    def refresh(self, user_id):
+        ids = self.load(user_id)
+        if settings.CACHE_IS_SHARED:
+            cache.set(self.get_key(user_id), ids, MEMBERSHIP_CACHE_TIMEOUT)
+        return ids
+
+    def get(self, user_id):
+        return get_memberships(user_id, self)[0]
+
+    def refresh_on_commit(self, user_id):
+        """Для view, которые меняют множество: пересобрать сразу."""
+        if settings.CACHE_IS_SHARED:
+            transaction.on_commit(lambda: self.refresh(user_id))
+
+    def invalidate(self, user_id):
+        """Для остальных изменений: пересоберётся при следующем чтении."""
+        if settings.CACHE_IS_SHARED:
+            key = self.get_key(user_id)
+            transaction.on_commit(lambda: cache.delete(key))
+
+
+def get_memberships(user_id, *memberships):
+    """Несколько множеств пользователя за одно обращение к кешу."""
+    if not settings.CACHE_IS_SHARED:
+        return [membership.load(user_id) for membership in memberships]
+    keys = [membership.get_key(user_id) for membership in memberships]
+    cached = cache.get_many(keys)
+    return [
+        cached[key] if key in cached else membership.refresh(user_id)
+        for key, membership in zip(keys, memberships)
+    ]
+
+
+def get_viewer_memberships(context, *memberships):
+    """
+    Множества текущего пользователя для сериализаторов DRF. Читаются
+    из кеша один раз на ответ и хранятся в общем context.
+    """
+    request = context.get('request')
+    if not request or not request.user.is_authenticated:
+        return [frozenset()] * len(memberships)
+    loaded = context.setdefault('memberships', {})
+    missing = [
+        membership for membership in memberships
+        if membership.name not in loaded
+    ]
+    if missing:
+        loaded.update(zip(
+            (membership.name for membership in missing),
+            get_memberships(request.user.id, *missing)
+        ))
+    return [loaded[membership.name] for membership in memberships]
@@ -0,0 +1,166 @@
+import threading
+import time
+from bisect import bisect_left
+
+from django.http import HttpResponse
+
+# Границы корзин в секундах и в штуках запросов к БД.
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class QueryTimer:
+    """Считает количество и суммарное время SQL-запросов."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class Histogram:
+    """
+    Гистограмма в формате Prometheus с меткой view.
+    Память ограничена: фиксированные корзины на каждый view.
+    """
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, view, value):
+        with self._lock:
+            series = self._series.get(view)
+            if series is None:
+                series = self._series[view] = {
+                    'buckets': [0] * len(self.buckets),
+                    'sum': 0.0,
+                    'count': 0,
+                }
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series['buckets'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+        with self._lock:
+            series = {
+                view: (list(data['buckets']), data['sum'], data['count'])
+                for view, data in self._series.items()
+            }
+        for view, (buckets, total, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, value in zip(self.buckets, buckets):
+                cumulative += value
+                lines.append(
+                    f'{self.name}_bucket{{view="{view}",le="{bound}"}} '
+                    f'{cumulative}'
+                )
+            lines.append(
+                f'{self.name}_bucket{{view="{view}",le="+Inf"}} {count}'
+            )
+            lines.append(f'{self.name}_sum{{view="{view}"}} {total}')
+            lines.append(f'{self.name}_count{{view="{view}"}} {count}')
+        return lines
+
+
+class Counter:
+    """Счётчик в формате Prometheus с меткой alias базы данных."""
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, alias):
+        with self._lock:
+            self._values[alias] = self._values.get(alias, 0) + 1
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} counter',
+        ]
+        with self._lock:
+            values = dict(self._values)
+        for alias, value in sorted(values.items()):
+            lines.append(f'{self.name}{{alias="{alias}"}} {value}')
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    'foodgram_request_duration_seconds',
+    'Полное время обработки запроса.',
+    DURATION_BUCKETS
+)
+DB_DURATION = Histogram(
+    'foodgram_db_duration_seconds',
+    'Время выполнения SQL-запросов за запрос.',
+    DURATION_BUCKETS
+)
+DB_QUERIES = Histogram(
+    'foodgram_db_queries',
+    'Количество SQL-запросов за запрос.',
+    QUERY_COUNT_BUCKETS
+)
+APP_DURATION = Histogram(
+    'foodgram_app_duration_seconds',
+    'Время работы view без учёта SQL (в основном сериализация).',
+    DURATION_BUCKETS
+)
+RENDER_DURATION = Histogram(
+    'foodgram_render_duration_seconds',
+    'Время рендеринга ответа.',
+    DURATION_BUCKETS
+)
+
+DB_CONNECTIONS_OPENED = Counter(
+    'foodgram_db_connections_opened_total',
+    'Новые соединения с БД, включая переподключения после health check.'
+)
+DB_CONNECTIONS_REUSED = Counter(
+    'foodgram_db_connections_reused_total',
+    'Запросы, начатые с уже открытым соединением.'
+)
+
+METRICS = (
+    REQUEST_DURATION, DB_DURATION, DB_QUERIES, APP_DURATION, RENDER_DURATION,
+    DB_CONNECTIONS_OPENED, DB_CONNECTIONS_REUSED
+)
+
+
+def count_connection_opened(sender, connection, **kwargs):
+    DB_CONNECTIONS_OPENED.inc(connection.alias)
+
+
+def render_metrics():
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Метрики текущего процесса в текстовом формате Prometheus."""
+    return HttpResponse(
+        render_metrics(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -0,0 +1,309 @@
+import hashlib
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth.middleware import \
+    AuthenticationMiddleware as BaseAuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.middleware import \
+    MessageMiddleware as BaseMessageMiddleware
+from django.contrib.sessions.middleware import \
+    SessionMiddleware as BaseSessionMiddleware
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.middleware.csrf import CsrfViewMiddleware as BaseCsrfViewMiddleware
+from django.utils.functional import SimpleLazyObject
+from rest_framework.exceptions import AuthenticationFailed
+from users.authentication import CachedTokenAuthentication
+
+from .constants import API_PATH_PREFIX
+from .metrics import (APP_DURATION, DB_CONNECTIONS_REUSED, DB_DURATION,
+                      DB_QUERIES, RENDER_DURATION, REQUEST_DURATION,
+                      QueryTimer, count_connection_opened)
+from .profiling import QueryRecorder, StackSampler, write_dump
+from .routers import use_replica
+
+
+class PerformanceMetricsMiddleware:
+    """
+    Замеряет время запроса, SQL, работы view и рендеринга, отдаёт их
+    в заголовке Server-Timing и копит в гистограммах по view.
+    Выключен, пока PERFORMANCE_METRICS_ENABLED не задан.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PERFORMANCE_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        connection_created.connect(
+            count_connection_opened, dispatch_uid='count_connection_opened'
+        )
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        timer = QueryTimer()
+        request._metrics_render = [None, None]
+        with ExitStack() as stack:
+            for connection in connections.all():
+                if connection.connection is not None:
+                    DB_CONNECTIONS_REUSED.inc(connection.alias)
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        render_start, render_end = request._metrics_render
+        render = (
+            render_end - render_start
+            if render_start is not None and render_end is not None
+            else 0.0
+        )
+        app = max(total - timer.duration - render, 0.0)
+
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        REQUEST_DURATION.observe(view, total)
+        DB_DURATION.observe(view, timer.duration)
+        DB_QUERIES.observe(view, timer.count)
+        APP_DURATION.observe(view, app)
+        RENDER_DURATION.observe(view, render)
+
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={timer.duration * 1000:.1f};'
+            f'desc="{timer.count} queries"',
+            f'app;dur={app * 1000:.1f}',
+            f'render;dur={render * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ))
+        return response
+
+    def process_template_response(self, request, response):
+        # Ответы DRF рендерятся после всех process_template_response.
+        marks = request._metrics_render
+        marks[0] = time.perf_counter()
+
+        def render_finished(rendered):
+            marks[1] = time.perf_counter()
+
+        response.add_post_render_callback(render_finished)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Сэмплирующий профайлер для продакшена. Профилирует долю запросов
+    PROFILING_SAMPLE_RATE, запросы медленнее PROFILING_SLOW_THRESHOLD_MS
+    и запросы администратора с заголовком X-Foodgram-Profile. Дерево
+    вызовов и список SQL пишутся в PROFILING_DIR.
+    """
+
+    header = 'HTTP_X_FOODGRAM_PROFILE'
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sampler = StackSampler(settings.PROFILING_INTERVAL_MS / 1000)
+
+    def get_reason(self, request):
+        if request.META.get(self.header) and self.is_admin(request):
+            return 'header'
+        if random.random() < settings.PROFILING_SAMPLE_RATE:
+            return 'sample'
+        if settings.PROFILING_SLOW_THRESHOLD_MS:
+            return 'slow'
+        return None
+
+    @staticmethod
+    def is_admin(request):
+        return get_token_user(request).is_staff
+
+    def __call__(self, request):
+        reason = self.get_reason(request)
+        if reason is None:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        samples = self.sampler.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                response = self.get_response(request)
+        finally:
+            self.sampler.stop()
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        if (reason == 'slow'
+                and duration_ms < settings.PROFILING_SLOW_THRESHOLD_MS):
+            return response
+
+        match = request.resolver_match
+        write_dump(settings.PROFILING_DIR, settings.PROFILING_MAX_DUMPS, {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'view': match.view_name if match else 'unresolved',
+            'status': response.status_code,
+            'reason': reason,
+            'duration_ms': round(duration_ms, 3),
+            'interval_ms': settings.PROFILING_INTERVAL_MS,
+            'stacks': [
+                {'stack': list(stack), 'count': count}
+                for stack, count in samples.most_common()
+            ],
+            'queries': recorder.queries,
+        })
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Разрешает безопасным запросам читать с реплики, одной на весь
+    запрос. После успешной записи клиент на REPLICA_STICKY_SECONDS
+    закрепляется за основной базой, чтобы сразу видеть свои изменения.
+    Клиент узнаётся по cookie, а API-клиенты без cookie — по токену
+    или сессии через кеш, если он общий для всех воркеров
+    (CACHE_IS_SHARED). Анонимов без cookie по кешу не закрепить: за
+    nginx у всех них один REMOTE_ADDR.
+    Работает и под ASGI, не заставляя асинхронные view уходить в поток.
+    """
+
+    sync_capable = True
+    async_capable = True
+    cookie_name = 'foodgram_primary'
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def get_pin_key(request):
+        """Ключ закрепления в общем кеше или None, если его не вести."""
+        if not settings.CACHE_IS_SHARED:
+            return None
+        client = (
+            request.META.get('HTTP_AUTHORIZATION')
+            or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        )
+        if not client:
+            return None
+        return 'db:primary:' + hashlib.sha256(client.encode()).hexdigest()
+
+    def set_pin_cookie(self, response):
+        response.set_cookie(
+            self.cookie_name, '1',
+            max_age=settings.REPLICA_STICKY_SECONDS,
+            httponly=True, samesite='Lax'
+        )
+
+    @staticmethod
+    def get_replica(pinned):
+        return None if pinned else random.choice(settings.DATABASE_REPLICAS)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        pin_key = self.get_pin_key(request)
+        if request.method not in self.safe_methods:
+            response = self.get_response(request)
+            if response.status_code < 400:
+                if pin_key is not None:
+                    cache.set(pin_key, True, settings.REPLICA_STICKY_SECONDS)
+                self.set_pin_cookie(response)
+            return response
+
+        pinned = (
+            self.cookie_name in request.COOKIES
+            or pin_key is not None and cache.get(pin_key)
+        )
+        token = use_replica.set(self.get_replica(pinned))
+        try:
+            return self.get_response(request)
+        finally:
+            use_replica.reset(token)
+
+    async def __acall__(self, request):
+        pin_key = self.get_pin_key(request)
+        if request.method not in self.safe_methods:
+            response = await self.get_response(request)
+            if response.status_code < 400:
+                if pin_key is not None:
+                    await cache.aset(
+                        pin_key, True, settings.REPLICA_STICKY_SECONDS
+                    )
+                self.set_pin_cookie(response)
+            return response
+
+        pinned = (
+            self.cookie_name in request.COOKIES
+            or pin_key is not None and await cache.aget(pin_key)
+        )
+        token = use_replica.set(self.get_replica(pinned))
+        try:
+            return await self.get_response(request)
+        finally:
+            use_replica.reset(token)
+
+
+def get_token_user(request):
+    """Пользователь по токену; без токена или с неверным — аноним."""
+    try:
+        result = CachedTokenAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return AnonymousUser()
+    return result[0] if result else AnonymousUser()
+
+
+class SkipForApiMixin:
+    """
+    Пропускает middleware для запросов к /api/. API авторизуется только
+    токеном, поэтому сессия, CSRF и сообщения нужны лишь админке.
+    Подклассы остаются подклассами middleware Django, и проверки
+    админки видят их в MIDDLEWARE.
+    """
+
+    def __call__(self, request):
+        if request.path_info.startswith(API_PATH_PREFIX):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(SkipForApiMixin, BaseSessionMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(SkipForApiMixin, BaseCsrfViewMiddleware):
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if request.path_info.startswith(API_PATH_PREFIX):
+            return None
+        return super().process_view(
+            request, callback, callback_args, callback_kwargs
+        )
+
+
+class AuthenticationMiddleware(BaseAuthenticationMiddleware):
+    """
+    В /api/ сессии нет, поэтому request.user — пользователь по токену
+    (лениво, как у Django). Его видят middleware и код вне DRF; ошибку
+    неверного токена по-прежнему отдаёт DRF.
+    """
+
+    def process_request(self, request):
+        if request.path_info.startswith(API_PATH_PREFIX):
+            request.user = SimpleLazyObject(lambda: get_token_user(request))
+            return
+        super().process_request(request)
+
+
+class MessageMiddleware(SkipForApiMixin, BaseMessageMiddleware):
+    pass
@@ -0,0 +1,120 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .memberships import get_viewer_memberships
+
+
+def parse_fields_param(value):
+    if not value:
+        return set()
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Параметры ?fields= и ?omit= для ответов на чтение: убирают лишние
+    поля из сериализатора и позволяют вьюсету не загружать их из БД.
+    """
+
+    sparse_fields_actions = ('list', 'retrieve')
+
+    def get_sparse_fields(self):
+        """
+        Множество полей ответа, запрошенных клиентом,
+        или None, если ответ нужен целиком.
+        """
+        if (self.request is None
+                or self.request.method not in SAFE_METHODS
+                or self.action not in self.sparse_fields_actions):
+            return None
+        params = self.request.query_params
+        requested = parse_fields_param(params.get('fields'))
+        omitted = parse_fields_param(params.get('omit'))
+        if not requested and not omitted:
+            return None
+
+        available = set(self.get_serializer_class().Meta.fields)
+        unknown = (requested | omitted) - available
+        if unknown:
+            raise ValidationError({
+                'fields': 'Неизвестные поля: {}'.format(
+                    ', '.join(sorted(unknown))
+                )
+            })
+        return (requested or available) - omitted
+
+    def defer_sparse_fields(self, queryset, fields):
+        """Не загружать из БД колонки, которые не попадут в ответ."""
+        concrete = {
+            field.name for field in queryset.model._meta.concrete_fields
+            if not field.primary_key and not field.is_relation
+        }
+        deferred = (
+            concrete & set(self.get_serializer_class().Meta.fields)
+        ) - fields
+        if deferred:
+            queryset = queryset.defer(*deferred)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            serializer_fields = getattr(serializer, 'child', serializer).fields
+            for name in set(serializer_fields) - fields:
+                serializer_fields.pop(name)
+        return serializer
+
+
+class ValuesReadMixin:
+    """
+    list() и retrieve() без экземпляров моделей: строки .values()
+    сериализует values_serializer_class. С ?fields= и ?omit= работают
+    обычные list() и retrieve().
+    """
+
+    values_serializer_class = None
+
+    def get_values_queryset(self, serializer):
+        return self.filter_queryset(self.get_queryset()).prefetch_related(
+            None
+        ).values(*serializer.fields)
+
+    def list(self, request, *args, **kwargs):
+        if self.get_sparse_fields() is not None:
+            return super().list(request, *args, **kwargs)
+        serializer = self.values_serializer_class(request)
+        rows = self.get_values_queryset(serializer)
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(serializer.serialize(rows))
+        return self.get_paginated_response(serializer.serialize(page))
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.get_sparse_fields() is not None:
+            return super().retrieve(request, *args, **kwargs)
+        serializer = self.values_serializer_class(request)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            self.get_values_queryset(serializer),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        return Response(serializer.serialize([row])[0])
+
+
+class ViewerMembershipsMixin:
+    """
+    Множества текущего пользователя из viewer_memberships загружаются
+    один раз на ответ и передаются в context всем сериализаторам
+    вьюсета, включая вложенные: is_favorited, is_in_shopping_cart и
+    is_subscribed не делают запросов на объект.
+    """
+
+    viewer_memberships = ()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        get_viewer_memberships(context, *self.viewer_memberships)
+        return context
@@ -0,0 +1,117 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+# Не больше стольких SQL-запросов сохраняется в одном дампе.
+MAX_QUERIES_PER_DUMP = 1000
+MAX_STACK_DEPTH = 128
+
+
+def frame_key(code):
+    return f'{code.co_filename}:{code.co_firstlineno}:{code.co_name}'
+
+
+class StackSampler:
+    """
+    Сэмплирующий профайлер: фоновый поток раз в interval секунд снимает
+    стеки потоков, которые обрабатывают профилируемые запросы. Пока
+    таких запросов нет, поток ждёт на условии и не просыпается.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._has_targets = threading.Condition(self._lock)
+        self._thread = None
+        self._pid = None
+
+    def _ensure_started(self):
+        # Потоки не переживают fork воркера gunicorn.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(
+            target=self._run, name='stack-sampler', daemon=True
+        )
+        self._thread.start()
+
+    def start(self):
+        samples = Counter()
+        with self._lock:
+            self._ensure_started()
+            self._targets[threading.get_ident()] = samples
+            self._has_targets.notify()
+        return samples
+
+    def stop(self):
+        with self._lock:
+            self._targets.pop(threading.get_ident(), None)
+
+    def _run(self):
+        while True:
+            with self._has_targets:
+                self._has_targets.wait_for(lambda: self._targets)
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._targets:
+                    continue
+                frames = sys._current_frames()
+                for thread_id, samples in self._targets.items():
+                    frame = frames.get(thread_id)
+                    stack = []
+                    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                        stack.append(frame_key(frame.f_code))
+                        frame = frame.f_back
+                    if stack:
+                        samples[tuple(reversed(stack))] += 1
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if len(self.queries) < MAX_QUERIES_PER_DUMP:
+                self.queries.append({
+                    'sql': sql,
+                    'duration_ms': round(
+                        (time.perf_counter() - start) * 1000, 3
+                    ),
+                })
+
+
+def write_dump(directory, max_dumps, data):
+    """Сохраняет дамп и удаляет самые старые сверх max_dumps."""
+    os.makedirs(directory, exist_ok=True)
+    timestamp = datetime.now(timezone.utc)
+    data['timestamp'] = timestamp.isoformat()
+    name = '{}-{}.json'.format(
+        timestamp.strftime('%Y%m%dT%H%M%S%f'), os.getpid()
+    )
+    with open(os.path.join(directory, name), 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False)
+
+    dumps = sorted(
+        entry for entry in os.listdir(directory) if entry.endswith('.json')
+    )
+    for old in dumps[:-max_dumps]:
+        try:
+            os.remove(os.path.join(directory, old))
+        except FileNotFoundError:
+            pass
+
+
+def read_dumps(directory):
+    for entry in sorted(os.listdir(directory)):
+        if entry.endswith('.json'):
+            with open(os.path.join(directory, entry), encoding='utf-8') as f:
+                yield json.load(f)
@@ -0,0 +1,38 @@
+"""Маршрутизация чтения на реплики PostgreSQL."""
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Алиас реплики, которую ReplicaRoutingMiddleware выбрала для текущего
+# безопасного запроса: все его чтения идут в одну реплику с одним
+# отставанием. Команды, сигналы и всё остальное по умолчанию работают
+# с основной базой (None).
+use_replica = ContextVar('use_replica', default=None)
+
+REPLICA_APPS = ('recipes', 'users')
+
+
+class ReplicaRouter:
+    """
+    Чтение моделей recipes и users уходит на реплику, выбранную для
+    запроса, запись — в default. После первой записи
+    оставшиеся чтения того же запроса тоже идут в default.
+    """
+
+    def db_for_read(self, model, **hints):
+        replica = use_replica.get()
+        if replica is not None and model._meta.app_label in REPLICA_APPS:
+            return replica
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        use_replica.set(None)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -10,18 +10,23 @@ SECRET_KEY = os.getenv(
     'django-insecure-cg6*%6d51ef8f#4!r3*$vmxm4)abgjw8mo!4y-q*uq1!4$-89$'
 )
 
-DEBUG = True
+# По умолчанию выключен: с DEBUG Django копит все SQL-запросы в
+# connection.queries. Для разработки — DEBUG=True в .env.
+DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
 
+# backend — имя сервиса в docker-compose: так к Django обращаются из сети
+# контейнеров (healthcheck /ready/, сбор метрик /metrics/).
 ALLOWED_HOSTS = ['127.0.0.1', 'localhost', 'blackwachlearn.duckdns.org',
-                 '89.169.183.122']
+                 '89.169.183.122', 'backend']
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    'foodgram_backend.apps.AdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework.authtoken',
     'djoser',
@@ -32,12 +37,17 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'foodgram_backend.middleware.PerformanceMetricsMiddleware',
+    'foodgram_backend.middleware.ProfilingMiddleware',
+    'foodgram_backend.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    # Сессия, CSRF и сообщения — только вне /api/; в /api/ request.user
+    # определяется по токену.
+    'foodgram_backend.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'foodgram_backend.middleware.CsrfViewMiddleware',
+    'foodgram_backend.middleware.AuthenticationMiddleware',
+    'foodgram_backend.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -68,10 +78,64 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', 'admin'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'admin'),
         'HOST': os.getenv('DB_HOST', 'localhost'),
-        'PORT': os.getenv('DB_PORT', 5432)
+        'PORT': os.getenv('DB_PORT', 5432),
+        # Соединение живёт между запросами внутри процесса gunicorn:
+        # у sync-воркера оно одно, у gthread — по одному на поток.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': os.getenv(
+            'DB_CONN_HEALTH_CHECKS', 'True'
+        ).lower() == 'true',
+        'OPTIONS': {
+            'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 5)),
+        },
     }
 }
 
+# Реплики для чтения: DB_REPLICA_HOSTS=host1,host2. Для локальной
+# проверки можно указать тот же хост, что и у основной базы.
+DATABASE_REPLICAS = []
+for number, host in enumerate(
+    filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1
+):
+    DATABASE_REPLICAS.append(f'replica_{number}')
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'HOST': host.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['foodgram_backend.routers.ReplicaRouter']
+# Сколько секунд после записи клиент читает только из основной базы.
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 5))
+
+# Общий кеш всех воркеров: CACHE_URL=redis://redis:6379/0 (сервис redis
+# в docker-compose). Другой бэкенд задаётся CACHE_BACKEND и
+# CACHE_LOCATION. По умолчанию кеш свой у каждого процесса.
+CACHE_URL = os.getenv('CACHE_URL', '')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': os.getenv(
+                'CACHE_BACKEND',
+                'django.core.cache.backends.locmem.LocMemCache'
+            ),
+            'LOCATION': os.getenv('CACHE_LOCATION', ''),
+        }
+    }
+# Кеши, которые сбрасываются при записи (снимки пользователей по
+# токену, карточки рецептов, множества избранного и подписок), нужны
+# только с общим кешем: иначе сброс доходит лишь до одного воркера.
+CACHE_IS_SHARED = CACHES['default']['BACKEND'] not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
 AUTH_USER_MODEL = 'users.User'
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -112,7 +176,16 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'foodgram_backend.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'foodgram_backend.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -137,3 +210,35 @@ DJOSER = {
         'user_list': ['rest_framework.permissions.AllowAny'],
     },
 }
+
+# Асинхронные view для чтения тегов, ингредиентов, рецептов и профилей.
+# Включается только при запуске через ASGI (см. README).
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', 'False').lower() == 'true'
+
+# Server-Timing и метрики Prometheus по адресу /metrics/ (только внутри
+# сети контейнеров: nginx проксирует в backend лишь /api/ и /admin/).
+PERFORMANCE_METRICS_ENABLED = os.getenv(
+    'PERFORMANCE_METRICS_ENABLED', 'False'
+).lower() == 'true'
+
+# Сэмплирующий профайлер запросов, дампы пишутся в PROFILING_DIR
+# (см. manage.py profile_summary).
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False').lower() == 'true'
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0))
+PROFILING_SLOW_THRESHOLD_MS = int(os.getenv('PROFILING_SLOW_THRESHOLD_MS', 0))
+PROFILING_INTERVAL_MS = int(os.getenv('PROFILING_INTERVAL_MS', 5))
+PROFILING_DIR = os.getenv('PROFILING_DIR', '/tmp/foodgram-profiles')
+PROFILING_MAX_DUMPS = int(os.getenv('PROFILING_MAX_DUMPS', 200))
+
+# Статические снимки тегов и ингредиентов в STATIC_ROOT, которые отдаёт
+# nginx (см. manage.py build_catalogue_snapshots).
+CATALOGUE_SNAPSHOTS_ENABLED = os.getenv(
+    'CATALOGUE_SNAPSHOTS_ENABLED', 'False'
+).lower() == 'true'
+
+# Базовые значения для manage.py benchmark_api.
+BENCHMARK_BASELINES = BASE_DIR / 'benchmarks' / 'baselines.json'
+
+# Бюджет холодного старта процесса (импорт, django.setup() и URLconf),
+# проверяется тестом foodgram_backend.tests.StartupTests.
+STARTUP_BUDGET_MS = int(os.getenv('STARTUP_BUDGET_MS', 1500))
@@ -0,0 +1,134 @@
+from statistics import median
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import override_settings
+from rest_framework.authtoken.models import Token
+from users.models import User
+
+from .benchmark import measure_startup
+from .middleware import AuthenticationMiddleware, ReplicaRoutingMiddleware
+from .routers import ReplicaRouter
+
+
+class AuthenticationMiddlewareTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='cook@example.org',
+            username='cook',
+            first_name='Имя',
+            last_name='Фамилия',
+            password='Secret-pass-123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.factory = RequestFactory()
+        self.middleware = AuthenticationMiddleware(
+            lambda request: HttpResponse()
+        )
+
+    def get_user(self, **headers):
+        request = self.factory.get('/api/recipes/', headers=headers)
+        self.middleware(request)
+        return request.user
+
+    def test_api_user_from_token(self):
+        user = self.get_user(Authorization=f'Token {self.token.key}')
+        self.assertTrue(user.is_authenticated)
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_api_without_token_is_anonymous(self):
+        self.assertIsInstance(self.get_user(), AnonymousUser)
+
+    def test_api_invalid_token_is_anonymous(self):
+        user = self.get_user(Authorization='Token invalid')
+        self.assertIsInstance(user, AnonymousUser)
+
+    def test_api_invalid_token_rejected_by_drf(self):
+        response = self.client.get(
+            '/api/recipes/', headers={'Authorization': 'Token invalid'}
+        )
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1', 'replica_2'])
+class ReplicaRoutingMiddlewareTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.router = ReplicaRouter()
+
+    def read_databases(self, request):
+        """Базы, с которых view прочитал бы рецепты за один запрос."""
+        databases = []
+
+        def view(request):
+            databases.extend(
+                self.router.db_for_read(User) for _ in range(20)
+            )
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(view)(request)
+        return set(databases)
+
+    def write(self, **headers):
+        return ReplicaRoutingMiddleware(lambda request: HttpResponse())(
+            self.factory.post('/api/recipes/', headers=headers)
+        )
+
+    def test_one_replica_per_request(self):
+        databases = self.read_databases(self.factory.get('/api/recipes/'))
+        self.assertEqual(len(databases), 1)
+        self.assertIn(databases.pop(), ('replica_1', 'replica_2'))
+
+    @override_settings(CACHE_IS_SHARED=True)
+    def test_token_client_pinned_after_write(self):
+        self.write(Authorization='Token 1')
+        request = self.factory.get(
+            '/api/recipes/', headers={'Authorization': 'Token 1'}
+        )
+        self.assertEqual(self.read_databases(request), {'default'})
+        other = self.factory.get(
+            '/api/recipes/', headers={'Authorization': 'Token 2'}
+        )
+        self.assertNotIn('default', self.read_databases(other))
+
+    @override_settings(CACHE_IS_SHARED=True)
+    def test_anonymous_write_pins_only_by_cookie(self):
+        response = self.write()
+        self.assertIn(ReplicaRoutingMiddleware.cookie_name, response.cookies)
+        self.assertNotIn(
+            'default', self.read_databases(self.factory.get('/api/recipes/'))
+        )
+
+    @override_settings(CACHE_IS_SHARED=False)
+    def test_no_cache_pin_without_shared_cache(self):
+        self.write(Authorization='Token 1')
+        request = self.factory.get(
+            '/api/recipes/', headers={'Authorization': 'Token 1'}
+        )
+        self.assertIsNone(ReplicaRoutingMiddleware.get_pin_key(request))
+
+
+class StartupTests(SimpleTestCase):
+    """Холодный старт воркера укладывается в STARTUP_BUDGET_MS."""
+
+    # Нужны только странице импорта в админке (recipes.admin_import).
+    DEFERRED_MODULES = (
+        'import_export.admin', 'tablib', 'openpyxl', 'xlrd', 'odf'
+    )
+    RUNS = 3
+
+    def test_startup_within_budget(self):
+        startup = median(measure_startup()[0] for _ in range(self.RUNS))
+        self.assertLessEqual(startup, settings.STARTUP_BUDGET_MS)
+
+    def test_heavy_modules_are_not_loaded_on_startup(self):
+        _, modules, _ = measure_startup()
+        for name in self.DEFERRED_MODULES:
+            with self.subTest(module=name):
+                self.assertNotIn(name, modules)
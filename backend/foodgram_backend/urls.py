@@ -3,6 +3,9 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from .metrics import metrics_view
+from .warmup import ready_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
 
@@ -11,8 +14,13 @@ urlpatterns = [
 
     path('api/users/', include('users.urls')),
     path('api/', include('recipes.urls')),
+
+    path('ready/', ready_view, name='ready'),
 ]
 
+if settings.PERFORMANCE_METRICS_ENABLED:
+    urlpatterns.append(path('metrics/', metrics_view, name='metrics'))
+
 urlpatterns += static(
     settings.MEDIA_URL,
     document_root=settings.MEDIA_ROOT
@@ -0,0 +1,126 @@
+"""
+Прогрев процесса перед приёмом трафика: URL-резолвер, поля
+сериализаторов, соединение с БД и первые запросы к справочникам.
+"""
+import inspect
+import logging
+import os
+import threading
+import time
+from importlib import import_module
+from wsgiref.util import setup_testing_defaults
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+from django.http import JsonResponse
+from django.urls import get_resolver
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger(__name__)
+
+SERIALIZER_MODULES = ('recipes.serializers', 'users.serializers')
+# Внутренние GET-запросы прогрева: middleware, view, рендеринг и SQL.
+# format=json не даёт спискам тегов уйти редиректом на снимок каталога.
+WARMUP_PATHS = (
+    '/api/tags/?format=json',
+    '/api/ingredients/?name=%D0%B0',
+    '/api/recipes/?limit=1',
+    '/api/users/?limit=1',
+)
+
+state = {
+    'ready': False,
+    'pid': None,
+    'duration_ms': None,
+    'errors': [],
+}
+_lock = threading.Lock()
+
+
+def warm_urls():
+    # Заполняет кеши resolve() и reverse() для всех маршрутов.
+    get_resolver().reverse_dict
+
+
+def warm_serializers():
+    for module_name in SERIALIZER_MODULES:
+        module = import_module(module_name)
+        for _, serializer in inspect.getmembers(module, inspect.isclass):
+            if (issubclass(serializer, BaseSerializer)
+                    and serializer.__module__ == module_name):
+                serializer().fields
+
+
+def warm_requests():
+    handler = WSGIHandler()
+    errors = []
+    for path in WARMUP_PATHS:
+        path, _, query = path.partition('?')
+        environ = {
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'HTTP_HOST': 'localhost',
+        }
+        setup_testing_defaults(environ)
+        statuses = []
+        response = handler(
+            environ, lambda status, headers: statuses.append(status)
+        )
+        b''.join(response)
+        response.close()
+        if not statuses[0].startswith('2'):
+            errors.append(f'{path}: {statuses[0]}')
+    return errors
+
+
+def is_ready():
+    return state['ready'] and state['pid'] == os.getpid()
+
+
+def warm_up():
+    """
+    Прогревает текущий процесс. Повторяется, пока прогрев не пройдёт
+    без ошибок, например после недоступности БД.
+    """
+    with _lock:
+        if is_ready():
+            return
+        start = time.perf_counter()
+        errors = []
+        for step in (warm_urls, warm_serializers, warm_requests):
+            try:
+                errors.extend(step() or [])
+            except Exception as error:
+                logger.exception('Ошибка прогрева')
+                errors.append(repr(error))
+        state.update({
+            'ready': not errors,
+            'pid': os.getpid(),
+            'duration_ms': round((time.perf_counter() - start) * 1000, 1),
+            'errors': errors,
+        })
+        logger.info('Прогрев процесса %s: %s мс, ошибок %s', os.getpid(),
+                    state['duration_ms'], len(errors))
+
+
+def close_connections():
+    """Соединения мастера gunicorn нельзя наследовать воркерам."""
+    connections.close_all()
+
+
+def ready_view(request):
+    """
+    Готовность процесса для health check: 503, пока прогрев не прошёл.
+    Воркер gunicorn прогревается до приёма запросов, в остальных
+    случаях прогрев запускается при первом обращении.
+    """
+    warm_up()
+    return JsonResponse(
+        {
+            'ready': is_ready(),
+            'pid': os.getpid(),
+            'warmup_ms': state['duration_ms'],
+            'errors': state['errors'],
+        },
+        status=200 if is_ready() else 503
+    )
@@ -0,0 +1,46 @@
+"""
+Настройки gunicorn. Файл подхватывается автоматически при запуске
+из каталога backend, значения переопределяются переменными окружения.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:9000')
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+# Синхронному воркеру нужен запас на ожидание БД, асинхронному — по
+# процессу на ядро.
+workers = int(os.getenv(
+    'GUNICORN_WORKERS',
+    multiprocessing.cpu_count() * (1 if 'uvicorn' in worker_class else 2) + 1
+))
+threads = int(os.getenv('GUNICORN_THREADS', 1))
+
+# Django и все модули импортируются в мастере один раз, воркеры
+# получают их через fork.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True').lower() == 'true'
+# Перезапуск воркера после стольких запросов ограничивает рост памяти;
+# разброс не даёт всем воркерам перезапуститься одновременно.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+# Heartbeat-файлы воркеров в памяти, а не на overlay-диске контейнера.
+worker_tmp_dir = os.getenv('GUNICORN_WORKER_TMP_DIR', '/dev/shm')
+accesslog = os.getenv('GUNICORN_ACCESSLOG')
+
+
+def when_ready(server):
+    """Прогрев общих для всех воркеров кешей до fork."""
+    if not preload_app:
+        return
+    from foodgram_backend.warmup import close_connections, warm_up
+    warm_up()
+    close_connections()
+
+
+def post_worker_init(worker):
+    """Воркер начинает принимать запросы только после прогрева."""
+    from foodgram_backend.warmup import warm_up
+    warm_up()
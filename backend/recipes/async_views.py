@@ -0,0 +1,113 @@
+from asgiref.sync import sync_to_async
+from foodgram_backend.async_views import (Delegate, get_user,
+                                          get_values_serializer, json_response,
+                                          paginate)
+
+from .fast_serializers import RecipeValuesSerializer
+from .models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
+from .snapshots import get_snapshot_redirect
+
+TAG_FIELDS = ('id', 'name', 'slug')
+INGREDIENT_FIELDS = ('id', 'name', 'measurement_unit')
+
+
+async def tag_list(request):
+    await get_user(request)
+    redirect = get_snapshot_redirect(request, 'tags')
+    if redirect is not None:
+        return redirect
+    return json_response(
+        [tag async for tag in Tag.objects.values(*TAG_FIELDS)]
+    )
+
+
+async def tag_detail(request, pk):
+    await get_user(request)
+    tag = await Tag.objects.values(*TAG_FIELDS).filter(pk=pk).afirst()
+    if tag is None:
+        raise Delegate
+    return json_response(tag)
+
+
+async def ingredient_list(request):
+    await get_user(request)
+    redirect = get_snapshot_redirect(request, 'ingredients')
+    if redirect is not None:
+        return redirect
+    queryset = Ingredient.objects.order_by('name')
+    name = request.GET.get('name', '').strip()
+    if any(char in name for char in ' ,"\'\x00'):
+        # Несколько слов SearchFilter ищет по каждому отдельно.
+        raise Delegate
+    if name:
+        queryset = queryset.filter(name__istartswith=name)
+    return json_response(
+        [item async for item in queryset.values(*INGREDIENT_FIELDS)]
+    )
+
+
+async def ingredient_detail(request, pk):
+    await get_user(request)
+    ingredient = await Ingredient.objects.values(
+        *INGREDIENT_FIELDS
+    ).filter(pk=pk).afirst()
+    if ingredient is None:
+        raise Delegate
+    return json_response(ingredient)
+
+
+async def filter_recipes(request, queryset, viewer):
+    """Фильтры RecipeFilter; некорректные значения обрабатывает DRF."""
+    params = request.GET
+    slugs = set(params.getlist('tags'))
+    if slugs:
+        known = await Tag.objects.filter(slug__in=slugs).acount()
+        if known != len(slugs):
+            raise Delegate
+        queryset = queryset.filter(tags__slug__in=slugs).distinct()
+    if 'author' in params:
+        if not params['author'].isdigit():
+            raise Delegate
+        queryset = queryset.filter(author_id=params['author'])
+    for param, model in (
+        ('is_favorited', Favorite), ('is_in_shopping_cart', ShoppingCart)
+    ):
+        value = params.get(param, '')
+        if not value:
+            continue
+        if not value.isdigit():
+            raise Delegate
+        if int(value) and viewer is not None:
+            queryset = queryset.filter(id__in=model.objects.filter(
+                user=viewer
+            ).values('recipe_id'))
+    return queryset
+
+
+async def recipe_list(request):
+    if 'updated_since' in request.GET:
+        raise Delegate
+    viewer = await get_user(request)
+    serializer = get_values_serializer(
+        RecipeValuesSerializer, request, viewer
+    )
+    queryset = await filter_recipes(request, Recipe.objects.all(), viewer)
+    return json_response(await paginate(
+        request, queryset.values(*serializer.fields), serializer.serialize
+    ))
+
+
+async def recipe_detail(request, pk):
+    viewer = await get_user(request)
+    serializer = get_values_serializer(
+        RecipeValuesSerializer, request, viewer
+    )
+    row = await Recipe.objects.values(*serializer.fields).filter(
+        pk=pk
+    ).afirst()
+    if row is None:
+        raise Delegate
+    data = await sync_to_async(serializer.serialize)([row])
+    if not data:
+        raise Delegate
+    return json_response(data[0])
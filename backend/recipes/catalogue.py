@@ -0,0 +1,168 @@
+"""Выгрузка и загрузка каталога рецептов в формате NDJSON."""
+import json
+from dataclasses import dataclass
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Prefetch
+from users.models import User
+
+from .constants import CATALOGUE_EXPORT_CHUNK_SIZE, CATALOGUE_IMPORT_BATCH_SIZE
+from .models import Ingredient, IngredientInRecipe, Recipe, Tag
+from .snapshots import rebuild_snapshots
+
+
+def iter_recipe_records(chunk_size=CATALOGUE_EXPORT_CHUNK_SIZE):
+    """
+    Рецепты по одному словарю. iterator() на PostgreSQL читает через
+    серверный курсор, а prefetch выполняется для каждой пачки отдельно.
+    """
+    queryset = Recipe.objects.select_related('author').prefetch_related(
+        'tags',
+        Prefetch(
+            'ingredient_amounts',
+            queryset=IngredientInRecipe.objects.select_related('ingredient')
+        )
+    ).order_by('id')
+    for recipe in queryset.iterator(chunk_size=chunk_size):
+        yield {
+            'id': recipe.id,
+            'author': recipe.author.username,
+            'name': recipe.name,
+            'text': recipe.text,
+            'image': recipe.image.name,
+            'cooking_time': recipe.cooking_time,
+            'created_at': recipe.created_at.isoformat(),
+            'tags': [
+                {'name': tag.name, 'slug': tag.slug}
+                for tag in recipe.tags.all()
+            ],
+            'ingredients': [
+                {
+                    'name': item.ingredient.name,
+                    'measurement_unit': item.ingredient.measurement_unit,
+                    'amount': item.amount,
+                }
+                for item in recipe.ingredient_amounts.all()
+            ],
+        }
+
+
+def iter_ndjson(chunk_size=CATALOGUE_EXPORT_CHUNK_SIZE):
+    for record in iter_recipe_records(chunk_size):
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+@dataclass
+class ImportResult:
+    read: int = 0
+    created: int = 0
+    skipped: int = 0
+
+
+def get_or_create_tags(records):
+    """
+    Теги ищутся по slug. Тег не создаётся, если его название уже занято
+    тегом с другим slug, — это ошибка загрузки (ValueError).
+    """
+    tags = {
+        tag['slug']: tag['name']
+        for record in records for tag in record['tags']
+    }
+    Tag.objects.bulk_create(
+        [Tag(name=name, slug=slug) for slug, name in tags.items()],
+        ignore_conflicts=True
+    )
+    ids = dict(Tag.objects.filter(slug__in=tags).values_list('slug', 'id'))
+    conflicts = sorted(
+        f'{tags[slug]} ({slug})' for slug in tags.keys() - ids.keys()
+    )
+    if conflicts:
+        raise ValueError(
+            'Название тега занято тегом с другим slug: '
+            + ', '.join(conflicts)
+        )
+    return ids
+
+
+def get_or_create_ingredients(records):
+    keys = {
+        (item['name'], item['measurement_unit'])
+        for record in records for item in record['ingredients']
+    }
+    Ingredient.objects.bulk_create(
+        [Ingredient(name=name, measurement_unit=unit) for name, unit in keys],
+        ignore_conflicts=True
+    )
+    ingredients = Ingredient.objects.filter(
+        name__in={name for name, _ in keys}
+    ).values_list('name', 'measurement_unit', 'id')
+    return {(name, unit): pk for name, unit, pk in ingredients}
+
+
+def import_batch(records, result):
+    """
+    Пачка рецептов за несколько запросов: рецепты, связи с тегами,
+    ингредиенты. Рецепты авторов, которых нет в базе, пропускаются.
+    """
+    authors = dict(User.objects.filter(
+        username__in={record['author'] for record in records}
+    ).values_list('username', 'id'))
+    valid = [record for record in records if record['author'] in authors]
+    result.skipped += len(records) - len(valid)
+    records = valid
+    if not records:
+        return
+    with transaction.atomic():
+        tags = get_or_create_tags(records)
+        ingredients = get_or_create_ingredients(records)
+        recipes = Recipe.objects.bulk_create([
+            Recipe(
+                author_id=authors[record['author']],
+                name=record['name'],
+                text=record['text'],
+                image=record['image'],
+                cooking_time=record['cooking_time'],
+            )
+            for record in records
+        ])
+        # auto_now_add перезаписывает дату при вставке, возвращаем исходную.
+        for recipe, record in zip(recipes, records):
+            recipe.created_at = record['created_at']
+        Recipe.objects.bulk_update(recipes, ['created_at'])
+        Recipe.tags.through.objects.bulk_create([
+            Recipe.tags.through(recipe_id=recipe.id, tag_id=tags[tag['slug']])
+            for recipe, record in zip(recipes, records)
+            for tag in record['tags']
+        ], ignore_conflicts=True)
+        IngredientInRecipe.objects.bulk_create([
+            IngredientInRecipe(
+                recipe_id=recipe.id,
+                ingredient_id=ingredients[
+                    (item['name'], item['measurement_unit'])
+                ],
+                amount=item['amount']
+            )
+            for recipe, record in zip(recipes, records)
+            for item in record['ingredients']
+        ], ignore_conflicts=True)
+    result.created += len(recipes)
+
+
+def import_ndjson(stream, batch_size=CATALOGUE_IMPORT_BATCH_SIZE):
+    """
+    Загружает рецепты из потока NDJSON. Идентификаторы из файла не
+    сохраняются, повторная загрузка создаст рецепты заново. Загрузка
+    идёт одной транзакцией: при ошибке в любой пачке не сохраняется
+    ничего.
+    """
+    result = ImportResult()
+    records = (json.loads(line) for line in stream if line.strip())
+    with transaction.atomic():
+        while batch := list(islice(records, batch_size)):
+            result.read += len(batch)
+            import_batch(batch, result)
+    if result.created:
+        # Теги и ингредиенты создаются bulk_create без сигналов.
+        rebuild_snapshots()
+    return result
@@ -8,3 +8,18 @@ MIN_INGREDIENT_AMOUNT = 1
 LIST_PER_PAGE_TAG = 50
 LIST_PER_PAGE_RECIPE = 25
 LIST_PER_PAGE_FAVORITE = 30
+TAG_FACETS_CACHE_TIMEOUT = 60
+TAG_FACETS_CACHE_PREFIX = 'recipes:tag_facets'
+RECIPES_BATCH_MAX_SIZE = 100
+TOMBSTONE_KIND_MAX_LENGTH = 32
+TOMBSTONE_RETENTION_DAYS = 30
+SYNC_PAGE_SIZE = 500
+SYNC_CURSOR_MARGIN = 60
+CATALOGUE_EXPORT_CHUNK_SIZE = 500
+CATALOGUE_IMPORT_BATCH_SIZE = 500
+RECIPE_FRAGMENT_CACHE_PREFIX = 'recipes:fragment:v1'
+RECIPE_FRAGMENT_CACHE_TIMEOUT = 60 * 60
+CATALOGUE_SNAPSHOT_DIR = 'catalogue'
+CATALOGUE_SNAPSHOT_MANIFEST = 'manifest.json'
+CATALOGUE_SNAPSHOT_VERSION_LENGTH = 16
+CATALOGUE_SNAPSHOT_FILE_MODE = 0o644
@@ -0,0 +1,414 @@
+"""Генерация воспроизводимых наборов данных для бенчмарков."""
+import io
+import random
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from users.models import Subscription, User
+
+from .models import (Favorite, Ingredient, IngredientInRecipe, Recipe,
+                     ShoppingCart, Tag)
+
+SCALES = {
+    '1k': 1_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+RECIPES_PER_USER = 10
+MIN_USERS = 20
+TAGS_COUNT = 12
+INGREDIENTS_COUNT = 2_000
+INGREDIENTS_PER_RECIPE = (3, 12)
+TAGS_PER_RECIPE = (1, 3)
+FAVORITES_PER_USER = 20
+CART_PER_USER = 5
+SUBSCRIPTIONS_PER_USER = 8
+ZIPF_EXPONENT = 1.1
+DEFAULT_PASSWORD = 'benchmark-password'
+
+
+class ZipfSampler:
+    """
+    Выбор из range(size) с вероятностью примерно 1 / rank ** exponent.
+    Обратная функция распределения считается аналитически, поэтому
+    память не зависит от size.
+    """
+
+    def __init__(self, rng, size, exponent=ZIPF_EXPONENT):
+        self.rng = rng
+        self.size = size
+        self.power = 1 - exponent
+        self.span = (size + 1) ** self.power - 1
+
+    def pick(self):
+        rank = (self.span * self.rng.random() + 1) ** (1 / self.power)
+        return min(int(rank) - 1, self.size - 1)
+
+    def sample(self, count):
+        count = min(count, self.size)
+        picked = set()
+        while len(picked) < count:
+            picked.add(self.pick())
+        return picked
+
+
+class DatasetGenerator:
+    """
+    Заполняет пустую БД пользователями, рецептами и связями между ними.
+    Популярность авторов и рецептов распределена по закону Ципфа,
+    количество избранного и подписок у пользователей — экспоненциально.
+    """
+
+    def __init__(self, recipes, seed=42, batch_size=5_000, log=None):
+        self.recipes_count = recipes
+        self.users_count = max(recipes // RECIPES_PER_USER, MIN_USERS)
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+
+    def count_for_user(self, mean):
+        return max(int(self.rng.expovariate(1 / mean)), 0)
+
+    def generate(self):
+        tag_ids = self.create_tags()
+        ingredient_ids = self.create_ingredients()
+        user_ids = self.create_users()
+        recipe_ids = self.create_recipes(user_ids, tag_ids, ingredient_ids)
+        self.create_relations(user_ids, recipe_ids)
+        self.create_subscriptions(user_ids)
+
+    def create_tags(self):
+        tags = Tag.objects.bulk_create(
+            Tag(name=f'Тег {number}', slug=f'tag-{number}')
+            for number in range(TAGS_COUNT)
+        )
+        return [tag.id for tag in tags]
+
+    def create_ingredients(self):
+        ingredients = Ingredient.objects.bulk_create(
+            (
+                Ingredient(
+                    name=f'ингредиент {number}',
+                    measurement_unit=self.rng.choice(('г', 'мл', 'шт'))
+                )
+                for number in range(INGREDIENTS_COUNT)
+            ),
+            batch_size=self.batch_size
+        )
+        return [ingredient.id for ingredient in ingredients]
+
+    def create_users(self):
+        password = make_password(DEFAULT_PASSWORD)
+        user_ids = []
+        for start in range(0, self.users_count, self.batch_size):
+            stop = min(start + self.batch_size, self.users_count)
+            users = User.objects.bulk_create(
+                User(
+                    email=f'user{number}@example.org',
+                    username=f'user{number}',
+                    first_name='Имя',
+                    last_name='Фамилия',
+                    password=password
+                )
+                for number in range(start, stop)
+            )
+            user_ids.extend(user.id for user in users)
+        self.log(f'Пользователей: {len(user_ids)}')
+        return user_ids
+
+    def create_recipes(self, user_ids, tag_ids, ingredient_ids):
+        authors = ZipfSampler(self.rng, len(user_ids))
+        ingredients = ZipfSampler(self.rng, len(ingredient_ids))
+        RecipeTag = Recipe.tags.through
+        recipe_ids = []
+        for start in range(0, self.recipes_count, self.batch_size):
+            stop = min(start + self.batch_size, self.recipes_count)
+            recipes = Recipe.objects.bulk_create(
+                Recipe(
+                    name=f'Рецепт {number}',
+                    text='Описание рецепта. ' * self.rng.randint(1, 20),
+                    image='recipes/images/benchmark.png',
+                    cooking_time=self.rng.randint(5, 180),
+                    author_id=user_ids[authors.pick()]
+                )
+                for number in range(start, stop)
+            )
+            RecipeTag.objects.bulk_create(
+                RecipeTag(recipe_id=recipe.id, tag_id=tag_id)
+                for recipe in recipes
+                for tag_id in self.rng.sample(
+                    tag_ids, self.rng.randint(*TAGS_PER_RECIPE)
+                )
+            )
+            IngredientInRecipe.objects.bulk_create(
+                IngredientInRecipe(
+                    recipe_id=recipe.id,
+                    ingredient_id=ingredient_ids[index],
+                    amount=self.rng.randint(1, 500)
+                )
+                for recipe in recipes
+                for index in ingredients.sample(
+                    self.rng.randint(*INGREDIENTS_PER_RECIPE)
+                )
+            )
+            recipe_ids.extend(recipe.id for recipe in recipes)
+            self.log(f'Рецептов: {len(recipe_ids)}')
+        return recipe_ids
+
+    def create_relations(self, user_ids, recipe_ids):
+        popular = ZipfSampler(self.rng, len(recipe_ids))
+        for model, mean in ((Favorite, FAVORITES_PER_USER),
+                            (ShoppingCart, CART_PER_USER)):
+            batch = []
+            for user_id in user_ids:
+                batch.extend(
+                    model(user_id=user_id, recipe_id=recipe_ids[index])
+                    for index in popular.sample(self.count_for_user(mean))
+                )
+                if len(batch) >= self.batch_size:
+                    model.objects.bulk_create(batch)
+                    batch = []
+            model.objects.bulk_create(batch)
+            self.log(f'{model._meta.verbose_name_plural}: готово')
+
+    def create_subscriptions(self, user_ids):
+        authors = ZipfSampler(self.rng, len(user_ids))
+        batch = []
+        for user_id in user_ids:
+            batch.extend(
+                Subscription(user_id=user_id, author_id=user_ids[index])
+                for index in authors.sample(
+                    self.count_for_user(SUBSCRIPTIONS_PER_USER)
+                )
+                if user_ids[index] != user_id
+            )
+            if len(batch) >= self.batch_size:
+                Subscription.objects.bulk_create(batch)
+                batch = []
+        Subscription.objects.bulk_create(batch)
+        self.log('Подписки: готово')
+
+
+class IteratorFile(io.TextIOBase):
+    """Файлоподобная обёртка над итератором строк для COPY FROM STDIN."""
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.buffer = ''
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            try:
+                self.buffer += next(self.lines)
+            except StopIteration:
+                break
+        if size < 0:
+            size = len(self.buffer)
+        chunk, self.buffer = self.buffer[:size], self.buffer[size:]
+        return chunk
+
+
+class CopyDatasetGenerator:
+    """
+    Потоковая генерация больших наборов данных через PostgreSQL COPY.
+
+    Строки создаются генераторами и уходят в COPY пачками по batch_size,
+    id пользователей и рецептов выдаются подряд после текущего максимума,
+    поэтому в памяти не держится ничего, кроме одной пачки. Пары в
+    избранном, корзине и подписках уникальны по построению, так что
+    уникальные ограничения остаются включены; вторичные индексы из
+    Meta.indexes по желанию снимаются на время загрузки.
+    """
+
+    models = (User, Recipe, Recipe.tags.through, IngredientInRecipe,
+              Favorite, ShoppingCart, Subscription)
+
+    def __init__(self, users, recipes, favorites=FAVORITES_PER_USER,
+                 cart=CART_PER_USER, subscriptions=SUBSCRIPTIONS_PER_USER,
+                 seed=42, batch_size=100_000, drop_indexes=False, log=None):
+        self.users_count = users
+        self.recipes_count = recipes
+        self.favorites = favorites
+        self.cart = cart
+        self.subscriptions = subscriptions
+        self.seed = seed
+        self.batch_size = batch_size
+        self.drop_indexes = drop_indexes
+        self.log = log or (lambda message: None)
+        self.start = datetime.now(timezone.utc) - timedelta(days=730)
+        self.rows = {}
+
+    def rng(self, name):
+        """Отдельный генератор на таблицу: данные не зависят от порядка."""
+        return random.Random(f'{self.seed}:{name}')
+
+    def timestamp(self, offset):
+        return (self.start + timedelta(seconds=offset)).isoformat()
+
+    def generate(self):
+        if connection.vendor != 'postgresql':
+            raise RuntimeError('COPY доступен только для PostgreSQL.')
+        self.tag_ids = list(Tag.objects.values_list('id', flat=True))
+        if not self.tag_ids:
+            self.tag_ids = DatasetGenerator(0).create_tags()
+        self.ingredient_ids = list(
+            Ingredient.objects.values_list('id', flat=True)
+        )
+        if not self.ingredient_ids:
+            self.ingredient_ids = DatasetGenerator(0).create_ingredients()
+        self.first_user = self.next_id(User)
+        self.first_recipe = self.next_id(Recipe)
+
+        indexes = self.remove_indexes() if self.drop_indexes else []
+        self.copy(User, (
+            'id', 'password', 'is_superuser', 'username', 'first_name',
+            'last_name', 'email', 'is_staff', 'is_active', 'date_joined',
+        ), self.user_rows())
+        self.copy(Recipe, (
+            'id', 'name', 'text', 'image', 'cooking_time', 'author_id',
+            'created_at', 'updated_at',
+        ), self.recipe_rows())
+        self.copy(Recipe.tags.through, ('recipe_id', 'tag_id'),
+                  self.recipe_tag_rows())
+        self.copy(IngredientInRecipe,
+                  ('recipe_id', 'ingredient_id', 'amount'),
+                  self.ingredient_rows())
+        self.copy(Favorite, ('user_id', 'recipe_id', 'created_at'),
+                  self.relation_rows('favorites', self.favorites))
+        self.copy(ShoppingCart, ('user_id', 'recipe_id', 'added_at'),
+                  self.relation_rows('cart', self.cart))
+        self.copy(Subscription, ('user_id', 'author_id'),
+                  self.subscription_rows())
+        self.restore_indexes(indexes)
+        self.finish()
+        return self.rows
+
+    def next_id(self, model):
+        last = model.objects.order_by('-id').values_list('id', flat=True)
+        return (last.first() or 0) + 1
+
+    def copy(self, model, columns, rows):
+        table = model._meta.db_table
+        column_names = [model._meta.get_field(name).column
+                        if name != 'id' else 'id' for name in columns]
+        sql = 'COPY {} ({}) FROM STDIN'.format(
+            connection.ops.quote_name(table),
+            ', '.join(connection.ops.quote_name(name)
+                      for name in column_names)
+        )
+        total = 0
+        while True:
+            batch = self.take(rows, self.batch_size)
+            if not batch:
+                break
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute('SET LOCAL synchronous_commit = off')
+                cursor.copy_expert(sql, IteratorFile(
+                    '\t'.join(map(str, row)) + '\n' for row in batch
+                ))
+            total += len(batch)
+            self.log(f'{table}: {total}')
+        self.rows[table] = total
+
+    @staticmethod
+    def take(rows, count):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= count:
+                break
+        return batch
+
+    def user_rows(self):
+        password = make_password(DEFAULT_PASSWORD)
+        for user_id in range(self.first_user,
+                             self.first_user + self.users_count):
+            yield (
+                user_id, password, 'f', f'gen{user_id}', 'Имя', 'Фамилия',
+                f'gen{user_id}@example.org', 'f', 't',
+                self.timestamp(user_id),
+            )
+
+    def recipe_rows(self):
+        rng = self.rng('recipes')
+        authors = ZipfSampler(rng, self.users_count)
+        step = 730 * 24 * 3600 / max(self.recipes_count, 1)
+        for number in range(self.recipes_count):
+            created = self.timestamp(number * step)
+            yield (
+                self.first_recipe + number,
+                f'Рецепт {self.first_recipe + number}',
+                'Описание рецепта. ' * rng.randint(1, 20),
+                'recipes/images/benchmark.png',
+                rng.randint(5, 180),
+                self.first_user + authors.pick(),
+                created,
+                created,
+            )
+
+    def recipe_tag_rows(self):
+        rng = self.rng('tags')
+        for number in range(self.recipes_count):
+            for tag_id in rng.sample(self.tag_ids,
+                                     rng.randint(*TAGS_PER_RECIPE)):
+                yield self.first_recipe + number, tag_id
+
+    def ingredient_rows(self):
+        rng = self.rng('ingredients')
+        popular = ZipfSampler(rng, len(self.ingredient_ids))
+        for number in range(self.recipes_count):
+            for index in popular.sample(
+                    rng.randint(*INGREDIENTS_PER_RECIPE)):
+                yield (self.first_recipe + number,
+                       self.ingredient_ids[index], rng.randint(1, 500))
+
+    def relation_rows(self, name, mean):
+        rng = self.rng(name)
+        popular = ZipfSampler(rng, self.recipes_count)
+        for user_id in range(self.first_user,
+                             self.first_user + self.users_count):
+            count = int(rng.expovariate(1 / mean)) if mean else 0
+            for index in popular.sample(count):
+                yield (user_id, self.first_recipe + index,
+                       self.timestamp(rng.randint(0, 730 * 24 * 3600)))
+
+    def subscription_rows(self):
+        rng = self.rng('subscriptions')
+        authors = ZipfSampler(rng, self.users_count)
+        for user_id in range(self.first_user,
+                             self.first_user + self.users_count):
+            count = (int(rng.expovariate(1 / self.subscriptions))
+                     if self.subscriptions else 0)
+            for index in authors.sample(count):
+                author_id = self.first_user + index
+                if author_id != user_id:
+                    yield user_id, author_id
+
+    def remove_indexes(self):
+        indexes = [(model, index) for model in self.models
+                   for index in model._meta.indexes]
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.remove_index(model, index)
+        return indexes
+
+    def restore_indexes(self, indexes):
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                self.log(f'Создание индекса {index.name}')
+                editor.add_index(model, index)
+
+    def finish(self):
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                    no_style(), self.models):
+                cursor.execute(sql)
+            for model in self.models:
+                cursor.execute('ANALYZE {}'.format(
+                    connection.ops.quote_name(model._meta.db_table)
+                ))
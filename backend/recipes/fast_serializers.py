@@ -0,0 +1,65 @@
+from foodgram_backend.fast_serializers import (ValuesSerializer,
+                                               media_url_getter)
+from users.memberships import SUBSCRIPTIONS
+from users.models import User
+
+from .fragments import get_fragments
+from .memberships import FAVORITES, SHOPPING_CART
+from .models import Recipe
+
+
+class RecipeValuesSerializer(ValuesSerializer):
+    """
+    То же, что RecipeListSerializer, по id рецептов. Общие для всех
+    пользователей части карточек берутся из кеша (recipes.fragments),
+    флаги текущего пользователя — из его множеств в кеше
+    (foodgram_backend.memberships).
+    """
+
+    fields = ('id',)
+
+    def __init__(self, request):
+        super().__init__(request)
+        self.image_url = media_url_getter(
+            request, Recipe._meta.get_field('image')
+        )
+        self.avatar_url = media_url_getter(
+            request, User._meta.get_field('avatar')
+        )
+
+    def serialize(self, rows):
+        ids = [row['id'] for row in rows]
+        fragments = get_fragments(ids)
+        favorited, in_shopping_cart, subscribed = self.viewer_memberships(
+            FAVORITES, SHOPPING_CART, SUBSCRIPTIONS
+        )
+        image_url = self.image_url
+        avatar_url = self.avatar_url
+        data = []
+        for recipe_id in ids:
+            fragment = fragments.get(recipe_id)
+            if fragment is None:
+                # Рецепт удалён между запросом страницы и сборкой карточек.
+                continue
+            author = fragment['author']
+            data.append({
+                'id': recipe_id,
+                'tags': fragment['tags'],
+                'author': {
+                    'email': author['email'],
+                    'id': author['id'],
+                    'username': author['username'],
+                    'first_name': author['first_name'],
+                    'last_name': author['last_name'],
+                    'is_subscribed': author['id'] in subscribed,
+                    'avatar': avatar_url(author['avatar']),
+                },
+                'ingredients': fragment['ingredients'],
+                'is_favorited': recipe_id in favorited,
+                'is_in_shopping_cart': recipe_id in in_shopping_cart,
+                'name': fragment['name'],
+                'image': image_url(fragment['image']),
+                'text': fragment['text'],
+                'cooking_time': fragment['cooking_time'],
+            })
+        return data
@@ -20,6 +20,10 @@ class RecipeFilter(django_filters.FilterSet):
     is_in_shopping_cart = django_filters.NumberFilter(
         method='filter_is_in_shopping_cart'
     )
+    updated_since = django_filters.IsoDateTimeFilter(
+        field_name='updated_at',
+        lookup_expr='gt'
+    )
 
     def filter_is_favorited(self, queryset, name, value):
         if (value and hasattr(self, 'request')
@@ -43,4 +47,4 @@ class RecipeFilter(django_filters.FilterSet):
 
     class Meta:
         model = Recipe
-        fields = ['tags', 'author']
+        fields = ['tags', 'author', 'updated_since']
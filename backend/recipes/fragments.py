@@ -0,0 +1,116 @@
+"""
+Кеш частей карточки рецепта, одинаковых для всех пользователей: теги,
+ингредиенты, автор, текст и имя файла картинки. Флаги текущего
+пользователя и абсолютные URL добавляются при сборке ответа.
+
+Без общего кеша (CACHE_IS_SHARED) части собираются из БД на каждый
+ответ: сброс после изменения дошёл бы только до одного воркера.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from users.models import User
+
+from .constants import (RECIPE_FRAGMENT_CACHE_PREFIX,
+                        RECIPE_FRAGMENT_CACHE_TIMEOUT)
+from .models import IngredientInRecipe, Recipe
+
+RECIPE_FIELDS = ('id', 'author_id', 'name', 'image', 'text', 'cooking_time')
+AUTHOR_FIELDS = (
+    'email', 'id', 'username', 'first_name', 'last_name', 'avatar'
+)
+
+
+def get_fragment_key(recipe_id):
+    return f'{RECIPE_FRAGMENT_CACHE_PREFIX}:{recipe_id}'
+
+
+def get_tags(ids):
+    tags = defaultdict(list)
+    for recipe_id, *tag in Recipe.tags.through.objects.filter(
+        recipe_id__in=ids
+    ).order_by('tag__name').values_list(
+        'recipe_id', 'tag_id', 'tag__name', 'tag__slug'
+    ):
+        tags[recipe_id].append({'id': tag[0], 'name': tag[1], 'slug': tag[2]})
+    return tags
+
+
+def get_ingredients(ids):
+    ingredients = defaultdict(list)
+    for recipe_id, *item in IngredientInRecipe.objects.filter(
+        recipe_id__in=ids
+    ).order_by('id').values_list(
+        'recipe_id', 'ingredient_id', 'ingredient__name',
+        'ingredient__measurement_unit', 'amount'
+    ):
+        ingredients[recipe_id].append({
+            'id': item[0],
+            'name': item[1],
+            'measurement_unit': item[2],
+            'amount': item[3],
+        })
+    return ingredients
+
+
+def build_fragments(ids):
+    """По одному запросу на рецепты, теги, ингредиенты и авторов."""
+    rows = list(Recipe.objects.filter(id__in=ids).values(*RECIPE_FIELDS))
+    tags = get_tags(ids)
+    ingredients = get_ingredients(ids)
+    authors = {
+        author['id']: author
+        for author in User.objects.filter(
+            id__in={row['author_id'] for row in rows}
+        ).values(*AUTHOR_FIELDS)
+    }
+    return {
+        row['id']: {
+            'id': row['id'],
+            'tags': tags[row['id']],
+            'author': authors[row['author_id']],
+            'ingredients': ingredients[row['id']],
+            'name': row['name'],
+            'image': row['image'],
+            'text': row['text'],
+            'cooking_time': row['cooking_time'],
+        }
+        for row in rows
+    }
+
+
+def get_fragments(ids):
+    """Части карточек по id: из кеша, а недостающие — из БД."""
+    if not settings.CACHE_IS_SHARED:
+        return build_fragments(ids)
+    keys = {get_fragment_key(recipe_id): recipe_id for recipe_id in ids}
+    fragments = {
+        keys[key]: fragment
+        for key, fragment in cache.get_many(keys).items()
+    }
+    missing = [recipe_id for recipe_id in ids if recipe_id not in fragments]
+    if missing:
+        built = build_fragments(missing)
+        cache.set_many(
+            {
+                get_fragment_key(recipe_id): fragment
+                for recipe_id, fragment in built.items()
+            },
+            RECIPE_FRAGMENT_CACHE_TIMEOUT
+        )
+        fragments.update(built)
+    return fragments
+
+
+def invalidate_fragments(ids):
+    """
+    Сбрасывает кеш после коммита, иначе параллельный запрос может
+    успеть закешировать ещё не изменённые данные.
+    """
+    if not settings.CACHE_IS_SHARED:
+        return
+    keys = [get_fragment_key(recipe_id) for recipe_id in ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
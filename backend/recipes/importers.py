@@ -0,0 +1,174 @@
+"""Потоковая загрузка каталога ингредиентов из CSV и JSON."""
+import codecs
+import csv
+import json
+import subprocess
+import sys
+import threading
+import unicodedata
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .constants import INGREDIENT_NAME_MAX_LENGTH, MEASUREMENT_UNIT_MAX_LENGTH
+from .datagen import IteratorFile
+from .models import Ingredient
+from .snapshots import rebuild_snapshots
+
+CSV_HEADER = ['name', 'measurement_unit']
+JSON_CHUNK_SIZE = 64 * 1024
+COPY_ESCAPES = str.maketrans({
+    '\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'
+})
+
+
+@dataclass
+class ImportResult:
+    read: int = 0
+    invalid: int = 0
+    inserted: int = 0
+
+    @property
+    def skipped(self):
+        """Дубликаты в файле и уже существующие ингредиенты."""
+        return self.read - self.invalid - self.inserted
+
+
+def iter_csv(stream):
+    for row in csv.reader(stream):
+        if [value.strip() for value in row] == CSV_HEADER:
+            continue
+        yield row
+
+
+def iter_json(stream):
+    """
+    Объекты из JSON-массива или NDJSON, без чтения файла целиком.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    eof = False
+    while True:
+        buffer = buffer.lstrip(' \t\r\n,[]')
+        if not buffer:
+            if eof:
+                return
+            chunk = stream.read(JSON_CHUNK_SIZE)
+            eof = not chunk
+            buffer += chunk
+            continue
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = stream.read(JSON_CHUNK_SIZE)
+            eof = not chunk
+            buffer += chunk
+            continue
+        buffer = buffer[end:]
+        if not isinstance(item, dict):
+            # Пустая строка: clean_rows посчитает её некорректной.
+            yield []
+            continue
+        yield [item.get('name', ''), item.get('measurement_unit', '')]
+
+
+def normalize(value):
+    return ' '.join(unicodedata.normalize('NFC', str(value)).split())
+
+
+def clean_rows(rows, result):
+    for row in rows:
+        result.read += 1
+        if len(row) < 2:
+            result.invalid += 1
+            continue
+        name, unit = normalize(row[0]), normalize(row[1])
+        if (not name or not unit
+                or len(name) > INGREDIENT_NAME_MAX_LENGTH
+                or len(unit) > MEASUREMENT_UNIT_MAX_LENGTH):
+            result.invalid += 1
+            continue
+        yield name, unit
+
+
+def copy_and_upsert(rows):
+    """
+    COPY во временную таблицу и один INSERT ... ON CONFLICT DO NOTHING,
+    который заодно убирает дубликаты внутри файла.
+    """
+    table = connection.ops.quote_name(Ingredient._meta.db_table)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            'CREATE TEMP TABLE ingredient_import '
+            '(name text, measurement_unit text) ON COMMIT DROP'
+        )
+        cursor.copy_expert(
+            'COPY ingredient_import (name, measurement_unit) FROM STDIN',
+            IteratorFile(
+                f'{name.translate(COPY_ESCAPES)}\t'
+                f'{unit.translate(COPY_ESCAPES)}\n'
+                for name, unit in rows
+            )
+        )
+        cursor.execute(
+            f'INSERT INTO {table} (name, measurement_unit) '
+            'SELECT DISTINCT name, measurement_unit FROM ingredient_import '
+            'ON CONFLICT (name, measurement_unit) DO NOTHING'
+        )
+        return cursor.rowcount
+
+
+def bulk_create_rows(rows, batch_size):
+    """Запасной путь для баз без COPY."""
+    before = Ingredient.objects.count()
+    batch = []
+    for name, unit in rows:
+        batch.append(Ingredient(name=name, measurement_unit=unit))
+        if len(batch) >= batch_size:
+            Ingredient.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    Ingredient.objects.bulk_create(batch, ignore_conflicts=True)
+    return Ingredient.objects.count() - before
+
+
+def import_ingredients(stream, file_format, batch_size=5_000):
+    """Загружает ингредиенты из текстового потока CSV или JSON."""
+    result = ImportResult()
+    parse = iter_json if file_format == 'json' else iter_csv
+    rows = clean_rows(parse(stream), result)
+    if connection.vendor == 'postgresql':
+        result.inserted = copy_and_upsert(rows)
+    else:
+        result.inserted = bulk_create_rows(rows, batch_size)
+    if result.inserted:
+        rebuild_snapshots()
+    return result
+
+
+def import_ingredients_file(path, file_format=None):
+    if file_format is None:
+        file_format = 'json' if path.lower().endswith('json') else 'csv'
+    # utf-8-sig снимает BOM, который Excel добавляет в CSV.
+    with codecs.open(path, encoding='utf-8-sig') as stream:
+        return import_ingredients(stream, file_format)
+
+
+def import_in_background(path, file_format):
+    """
+    Импорт отдельным процессом manage.py import_ingredients: он
+    доработает, даже если воркер gunicorn перезапустится по
+    max_requests. Итог команда пишет в лог, файл затем удаляет.
+    """
+    process = subprocess.Popen(
+        [
+            sys.executable, str(settings.BASE_DIR / 'manage.py'),
+            'import_ingredients', path, '--format', file_format, '--delete'
+        ],
+        start_new_session=True
+    )
+    # Код завершения забирается, чтобы не оставался процесс-зомби.
+    threading.Thread(target=process.wait, daemon=True).start()
+    return process
@@ -0,0 +1,353 @@
+import base64
+import io
+import json
+import tempfile
+from itertools import count
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import (override_settings, setup_test_environment,
+                               teardown_test_environment)
+from django.utils import timezone
+from foodgram_backend.benchmark import (BenchmarkError, Scenario,
+                                        find_regressions, find_slowdowns,
+                                        load_baselines, run_scenario,
+                                        save_baselines)
+from PIL import Image
+from recipes.datagen import DEFAULT_PASSWORD, SCALES, DatasetGenerator
+from recipes.models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from users.models import Subscription, User
+
+
+def make_image():
+    buffer = io.BytesIO()
+    Image.new('RGB', (1, 1)).save(buffer, format='PNG')
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    return f'data:image/png;base64,{encoded}'
+
+
+class Command(BaseCommand):
+    help = (
+        'Бенчмарк всех действий API на сгенерированном наборе данных '
+        'в отдельной тестовой БД: перцентили времени и количество SQL '
+        'в сравнении с сохранёнными базовыми значениями. Ошибкой считается '
+        'только рост числа SQL-запросов, рост времени выводится в отчёте.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', choices=SCALES, default='1k',
+            help='Размер набора данных (количество рецептов).'
+        )
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Рост p95 относительно базового значения, о котором '
+                 'сообщает отчёт.'
+        )
+        parser.add_argument(
+            '--baselines', default=settings.BENCHMARK_BASELINES,
+            help='JSON с базовыми значениями.'
+        )
+        parser.add_argument(
+            '--update-baselines', action='store_true',
+            help='Записать результаты как новые базовые значения.'
+        )
+        parser.add_argument(
+            '--only', default='',
+            help='Запускать только сценарии, в названии которых есть строка.'
+        )
+        parser.add_argument(
+            '--output', help='Сохранить результаты в JSON-файл.'
+        )
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help='Не удалять тестовую БД, чтобы не генерировать данные '
+                 'заново при следующем запуске.'
+        )
+
+    def handle(self, *args, **options):
+        scale = options['scale']
+        if connection.vendor != 'sqlite':
+            # Отдельная БД на каждый масштаб, чтобы работал --keepdb.
+            test_settings = connection.settings_dict.setdefault('TEST', {})
+            test_settings['NAME'] = 'test_{}_benchmark_{}'.format(
+                connection.settings_dict['NAME'], scale
+            )
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options['keepdb']
+        )
+        for alias in settings.DATABASE_REPLICAS:
+            connections[alias].creation.set_as_test_mirror(
+                connection.settings_dict
+            )
+        try:
+            if not Recipe.objects.exists():
+                self.stdout.write(f'Генерация набора данных {scale}...')
+                DatasetGenerator(
+                    SCALES[scale], log=self.stdout.write
+                ).generate()
+            with tempfile.TemporaryDirectory() as media_root:
+                with override_settings(MEDIA_ROOT=media_root):
+                    results = self.run_scenarios(options)
+        except BenchmarkError as error:
+            raise CommandError(str(error))
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options['keepdb']
+            )
+            teardown_test_environment()
+
+        self.report(results)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump({scale: results}, file, ensure_ascii=False,
+                          indent=2)
+
+        baselines = load_baselines(options['baselines'])
+        if options['update_baselines']:
+            baselines.setdefault(scale, {}).update(results)
+            save_baselines(options['baselines'], baselines)
+            self.stdout.write(f'Базовые значения записаны в '
+                              f'{options["baselines"]}')
+            return
+        if scale not in baselines:
+            # Без базовых значений сравнивать не с чем, и проверка в CI
+            # не должна молча проходить.
+            raise CommandError(
+                f'Нет базовых значений для масштаба {scale} в '
+                f'{options["baselines"]}. Запишите их флагом '
+                f'--update-baselines.'
+            )
+        slowdowns = find_slowdowns(
+            results, baselines[scale], options['threshold']
+        )
+        if slowdowns:
+            # Базовое время записано на другой машине: это повод
+            # посмотреть профиль, но не ошибка.
+            self.stdout.write(self.style.WARNING(
+                'p95 выше базового:\n' + '\n'.join(slowdowns)
+            ))
+        regressions = find_regressions(results, baselines[scale])
+        if regressions:
+            raise CommandError(
+                'Выросло число SQL-запросов:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий по SQL нет.'))
+
+    def run_scenarios(self, options):
+        results = {}
+        for scenario in self.get_scenarios():
+            if options['only'] not in scenario.name:
+                continue
+            results[scenario.name] = run_scenario(
+                scenario, options['iterations'], options['warmup']
+            )
+            self.stdout.write(f'{scenario.name}: {results[scenario.name]}')
+        return results
+
+    def report(self, results):
+        self.stdout.write(
+            '\n{:<36}{:>10}{:>10}{:>10}{:>9}'.format(
+                'Сценарий', 'p50, мс', 'p95, мс', 'p99, мс', 'SQL'
+            )
+        )
+        for name, stats in results.items():
+            self.stdout.write(
+                '{:<36}{:>10.2f}{:>10.2f}{:>10.2f}{:>9}'.format(
+                    name, stats['p50'], stats['p95'], stats['p99'],
+                    stats['queries']
+                )
+            )
+
+    def get_scenarios(self):
+        user = (
+            User.objects.filter(recipes__isnull=False, favorites__isnull=False)
+            .order_by('id').first()
+        )
+        token, _ = Token.objects.get_or_create(user=user)
+        auth = APIClient()
+        auth.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        anon = APIClient()
+
+        recipe = Recipe.objects.order_by('id').first()
+        free_recipe = (
+            Recipe.objects.exclude(favorites__user=user)
+            .exclude(shopping_cart__user=user).order_by('id').first()
+        )
+        if not ShoppingCart.objects.filter(user=user).exists():
+            ShoppingCart.objects.create(user=user, recipe=recipe)
+        author = (
+            User.objects.exclude(id=user.id)
+            .exclude(following__user=user).order_by('id').first()
+        )
+        tags = list(Tag.objects.values_list('slug', flat=True)[:2])
+        tag_ids = list(Tag.objects.values_list('id', flat=True)[:2])
+        ingredient_ids = list(
+            Ingredient.objects.values_list('id', flat=True)[:3]
+        )
+        batch_ids = ','.join(
+            str(pk) for pk in
+            Recipe.objects.values_list('id', flat=True)[:20]
+        )
+        image = make_image()
+        recipe_payload = {
+            'ingredients': [
+                {'id': pk, 'amount': 10} for pk in ingredient_ids
+            ],
+            'tags': tag_ids,
+            'image': image,
+            'name': 'Рецепт бенчмарка',
+            'text': 'Описание',
+            'cooking_time': 10,
+        }
+        since = timezone.now().isoformat()
+        own_recipe = auth.post(
+            '/api/recipes/', recipe_payload, format='json'
+        ).data
+        numbers = count()
+        passwords = [DEFAULT_PASSWORD, f'{DEFAULT_PASSWORD}-2']
+
+        def created_recipe(response):
+            Recipe.objects.filter(id=response.data['id']).delete()
+
+        def new_recipe():
+            new_recipe.id = auth.post(
+                '/api/recipes/', recipe_payload, format='json'
+            ).data['id']
+
+        def created_user(response):
+            User.objects.filter(id=response.data['id']).delete()
+
+        def change_password():
+            response = auth.post('/api/users/set_password/', {
+                'current_password': passwords[0],
+                'new_password': passwords[1],
+            }, format='json')
+            passwords.reverse()
+            return response
+
+        def favorite():
+            Favorite.objects.get_or_create(user=user, recipe=free_recipe)
+
+        def unfavorite(response=None):
+            Favorite.objects.filter(user=user, recipe=free_recipe).delete()
+
+        def add_to_cart():
+            ShoppingCart.objects.get_or_create(user=user, recipe=free_recipe)
+
+        def remove_from_cart(response=None):
+            ShoppingCart.objects.filter(
+                user=user, recipe=free_recipe
+            ).delete()
+
+        def subscribe():
+            Subscription.objects.get_or_create(user=user, author=author)
+
+        def unsubscribe(response=None):
+            Subscription.objects.filter(user=user, author=author).delete()
+
+        def set_avatar():
+            auth.put('/api/users/me/avatar/', {'avatar': image},
+                     format='json')
+
+        return [
+            Scenario('tags-list', lambda: anon.get('/api/tags/')),
+            Scenario('tags-detail',
+                     lambda: anon.get(f'/api/tags/{tag_ids[0]}/')),
+            Scenario('ingredients-list',
+                     lambda: anon.get('/api/ingredients/')),
+            Scenario('ingredients-search',
+                     lambda: anon.get('/api/ingredients/?name=ингр')),
+            Scenario('ingredients-detail', lambda: anon.get(
+                f'/api/ingredients/{ingredient_ids[0]}/'
+            )),
+            Scenario('recipes-list-anon',
+                     lambda: anon.get('/api/recipes/')),
+            Scenario('recipes-list', lambda: auth.get('/api/recipes/')),
+            Scenario('recipes-list-100',
+                     lambda: auth.get('/api/recipes/?limit=100')),
+            Scenario('recipes-list-tags', lambda: auth.get(
+                '/api/recipes/', {'tags': tags}
+            )),
+            Scenario('recipes-list-author', lambda: auth.get(
+                f'/api/recipes/?author={recipe.author_id}'
+            )),
+            Scenario('recipes-list-favorited',
+                     lambda: auth.get('/api/recipes/?is_favorited=1')),
+            Scenario('recipes-list-cart', lambda: auth.get(
+                '/api/recipes/?is_in_shopping_cart=1'
+            )),
+            Scenario('recipes-list-facets',
+                     lambda: auth.get('/api/recipes/?facets=tags')),
+            Scenario('recipes-list-fields', lambda: auth.get(
+                '/api/recipes/?fields=id,name,image,cooking_time'
+            )),
+            Scenario('recipes-detail',
+                     lambda: auth.get(f'/api/recipes/{recipe.id}/')),
+            Scenario('recipes-batch', lambda: auth.get(
+                f'/api/recipes/batch/?ids={batch_ids}'
+            )),
+            Scenario('recipes-sync', lambda: auth.get(
+                '/api/recipes/sync/', {'updated_since': since}
+            )),
+            Scenario('recipes-get-link', lambda: anon.get(
+                f'/api/recipes/{recipe.id}/get-link/'
+            )),
+            Scenario('recipes-create', lambda: auth.post(
+                '/api/recipes/', recipe_payload, format='json'
+            ), after=created_recipe),
+            Scenario('recipes-update', lambda: auth.patch(
+                f'/api/recipes/{own_recipe["id"]}/', recipe_payload,
+                format='json'
+            )),
+            Scenario('recipes-destroy', lambda: auth.delete(
+                f'/api/recipes/{new_recipe.id}/'
+            ), before=new_recipe),
+            Scenario('recipes-favorite', lambda: auth.post(
+                f'/api/recipes/{free_recipe.id}/favorite/'
+            ), before=unfavorite, after=unfavorite),
+            Scenario('recipes-favorite-delete', lambda: auth.delete(
+                f'/api/recipes/{free_recipe.id}/favorite/'
+            ), before=favorite),
+            Scenario('recipes-shopping-cart', lambda: auth.post(
+                f'/api/recipes/{free_recipe.id}/shopping_cart/'
+            ), before=remove_from_cart, after=remove_from_cart),
+            Scenario('recipes-shopping-cart-delete', lambda: auth.delete(
+                f'/api/recipes/{free_recipe.id}/shopping_cart/'
+            ), before=add_to_cart),
+            Scenario('recipes-download-shopping-cart', lambda: auth.get(
+                '/api/recipes/download_shopping_cart/'
+            )),
+            Scenario('users-list', lambda: anon.get('/api/users/')),
+            Scenario('users-detail',
+                     lambda: auth.get(f'/api/users/{author.id}/')),
+            Scenario('users-me', lambda: auth.get('/api/users/me/')),
+            Scenario('users-create', lambda: anon.post('/api/users/', {
+                'email': f'bench{next(numbers)}@example.org',
+                'username': f'bench{next(numbers)}',
+                'first_name': 'Имя',
+                'last_name': 'Фамилия',
+                'password': DEFAULT_PASSWORD,
+            }, format='json'), after=created_user),
+            Scenario('users-set-password', change_password),
+            Scenario('users-set-avatar', lambda: auth.put(
+                '/api/users/me/avatar/', {'avatar': image}, format='json'
+            )),
+            Scenario('users-delete-avatar', lambda: auth.delete(
+                '/api/users/me/avatar/'
+            ), before=set_avatar),
+            Scenario('users-subscriptions',
+                     lambda: auth.get('/api/users/subscriptions/')),
+            Scenario('users-subscribe', lambda: auth.post(
+                f'/api/users/{author.id}/subscribe/'
+            ), before=unsubscribe, after=unsubscribe),
+            Scenario('users-unsubscribe', lambda: auth.delete(
+                f'/api/users/{author.id}/subscribe/'
+            ), before=subscribe),
+        ]
@@ -0,0 +1,93 @@
+from wsgiref.util import setup_testing_defaults
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from foodgram_backend.benchmark import summarize, time_call
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время запроса с новым соединением к БД на каждый '
+        'запрос и с постоянным соединением (CONN_MAX_AGE). Запросы идут '
+        'через WSGI-обработчик, как под gunicorn, поэтому соединения '
+        'закрываются и переиспользуются так же, как в продакшене.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default='/api/tags/',
+            help='Адрес, который запрашивается в цикле.'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=300,
+            help='Количество замеряемых запросов в каждом режиме.'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=20,
+            help='Прогревочные запросы, не попадающие в статистику.'
+        )
+        parser.add_argument(
+            '--max-age',
+            type=int,
+            default=600,
+            help='CONN_MAX_AGE для режима с постоянным соединением.'
+        )
+
+    def handle(self, *args, **options):
+        handler = WSGIHandler()
+        environ = {'PATH_INFO': options['path'], 'HTTP_HOST': 'localhost'}
+        setup_testing_defaults(environ)
+
+        def start_response(status, headers):
+            if not status.startswith('2'):
+                raise CommandError(f'{options["path"]}: ответ {status}')
+
+        def request():
+            response = handler(dict(environ), start_response)
+            b''.join(response)
+            response.close()
+
+        opened = []
+
+        def count_opened(sender, **kwargs):
+            opened.append(1)
+
+        connection_created.connect(count_opened)
+        original = connection.settings_dict['CONN_MAX_AGE']
+        results = {}
+        try:
+            for mode, max_age in (
+                ('без переиспользования', 0),
+                ('постоянное соединение', options['max_age']),
+            ):
+                connection.close()
+                connection.settings_dict['CONN_MAX_AGE'] = max_age
+                opened.clear()
+                stats = summarize(time_call(
+                    request, options['iterations'], options['warmup']
+                ))
+                stats['connections'] = len(opened)
+                results[mode] = stats
+        finally:
+            connection.settings_dict['CONN_MAX_AGE'] = original
+            connection_created.disconnect(count_opened)
+            connection.close()
+
+        for mode, stats in results.items():
+            self.stdout.write(
+                f'{mode:<24} p50={stats["p50"]:.3f} мс '
+                f'p95={stats["p95"]:.3f} мс '
+                f'соединений: {stats["connections"]}'
+            )
+        fresh, persistent = results.values()
+        self.stdout.write(self.style.SUCCESS(
+            f'Экономия на запрос (p50): '
+            f'{fresh["p50"] - persistent["p50"]:.3f} мс'
+        ))
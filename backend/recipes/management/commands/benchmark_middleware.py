@@ -0,0 +1,109 @@
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils.module_loading import import_string
+from django.views.decorators.csrf import csrf_exempt
+from foodgram_backend import middleware as project_middleware
+from foodgram_backend.benchmark import summarize, time_call
+
+
+@csrf_exempt
+def stub_view(request):
+    # Как view DRF: без проверки CSRF и с ответом JSON.
+    return HttpResponse(b'{}', content_type='application/json')
+
+
+class StubHandler(BaseHandler):
+    """Цепочка middleware без URL-резолвера и настоящего view."""
+
+    def _get_response(self, request):
+        for process_view in self._view_middleware:
+            response = process_view(request, stub_view, (), {})
+            if response:
+                return response
+        return stub_view(request)
+
+
+def get_stock_middleware():
+    """MIDDLEWARE, в котором middleware проекта заменены на исходные."""
+    middleware = []
+    for path in settings.MIDDLEWARE:
+        cls = import_string(path)
+        if cls.__module__ == project_middleware.__name__:
+            base = next((
+                base for base in cls.__mro__
+                if base.__module__.startswith('django.')
+            ), None)
+            if base is not None:
+                path = f'{base.__module__}.{base.__name__}'
+        middleware.append(path)
+    return middleware
+
+
+def build_handler(middleware):
+    with override_settings(MIDDLEWARE=middleware):
+        handler = StubHandler()
+        handler.load_middleware()
+    return handler
+
+
+class Command(BaseCommand):
+    help = (
+        'Микробенчмарк цепочки middleware: полный набор Django (сессия, '
+        'CSRF, пользователь и сообщения на каждом запросе) против набора '
+        'проекта, который пропускает их для /api/. View заменён '
+        'заглушкой, поэтому разница — чистые накладные расходы middleware.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default='/api/recipes/',
+            help='Адрес запроса (от него зависит, пропускаются ли '
+                 'middleware).'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20000,
+            help='Количество замеряемых запросов в каждом режиме.'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=1000,
+            help='Прогревочные запросы, не попадающие в статистику.'
+        )
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        cookies = {settings.SESSION_COOKIE_NAME: 'benchmark'}
+        handlers = {
+            'middleware Django': build_handler(get_stock_middleware()),
+            'middleware проекта': build_handler(settings.MIDDLEWARE),
+        }
+
+        results = {}
+        for mode, handler in handlers.items():
+            def request():
+                request = factory.get(options['path'])
+                request.COOKIES.update(cookies)
+                handler.get_response(request)
+
+            results[mode] = summarize(time_call(
+                request, options['iterations'], options['warmup']
+            ))
+
+        for mode, stats in results.items():
+            self.stdout.write(
+                f'{mode:<20} p50={stats["p50"] * 1000:.1f} мкс '
+                f'p95={stats["p95"] * 1000:.1f} мкс'
+            )
+        stock, lean = results.values()
+        self.stdout.write(self.style.SUCCESS(
+            f'Экономия на запрос (p50): '
+            f'{(stock["p50"] - lean["p50"]) * 1000:.1f} мкс'
+        ))
@@ -0,0 +1,78 @@
+import io
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from foodgram_backend.benchmark import summarize, time_call
+from foodgram_backend.renderers import ORJSONParser, ORJSONRenderer
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+DEFAULT_PATHS = ('/api/ingredients/', '/api/recipes/?limit=100')
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает JSONRenderer/JSONParser DRF с рендерером и парсером '
+        'на orjson на данных настоящих ответов API. Проверяет, что '
+        'результат рендеринга совпадает байт в байт.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            action='append',
+            dest='paths',
+            help='Адрес ответа для замера, можно указать несколько раз '
+                 f'(по умолчанию {", ".join(DEFAULT_PATHS)}).'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=200,
+            help='Количество замеров для каждого адреса.'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=20,
+            help='Прогревочные вызовы, не попадающие в статистику.'
+        )
+
+    def measure(self, func, options):
+        return summarize(time_call(
+            func, options['iterations'], options['warmup']
+        ))['p50']
+
+    def handle(self, *args, **options):
+        client = Client()
+        for path in options['paths'] or DEFAULT_PATHS:
+            response = client.get(path)
+            data = getattr(response, 'data', None)
+            if response.status_code != 200 or data is None:
+                raise CommandError(
+                    f'{path}: ответ {response.status_code} без данных DRF '
+                    '(асинхронные view отключаются ASYNC_READ_VIEWS=False).'
+                )
+            body = JSONRenderer().render(data)
+            if ORJSONRenderer().render(data) != body:
+                raise CommandError(f'{path}: ответы рендереров различаются.')
+
+            rendering = [
+                self.measure(lambda: renderer.render(data), options)
+                for renderer in (JSONRenderer(), ORJSONRenderer())
+            ]
+            parsing = [
+                self.measure(
+                    lambda: parser.parse(io.BytesIO(body)), options
+                )
+                for parser in (JSONParser(), ORJSONParser())
+            ]
+            self.stdout.write(f'{path} ({len(body) / 1024:.1f} КБ)')
+            for title, (stdlib, fast) in (
+                ('рендеринг', rendering), ('парсинг', parsing)
+            ):
+                self.stdout.write(
+                    f'  {title:<10} DRF {stdlib:.3f} мс, '
+                    f'orjson {fast:.3f} мс, '
+                    f'быстрее в {stdlib / max(fast, 0.001):.1f} раза'
+                )
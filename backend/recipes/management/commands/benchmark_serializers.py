@@ -0,0 +1,120 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from foodgram_backend.benchmark import summarize, time_call
+from foodgram_backend.renderers import ORJSONRenderer
+from recipes.views import RecipeViewSet
+from rest_framework.test import APIRequestFactory
+from users.models import User
+from users.views import UserViewSet
+
+VIEWSETS = {
+    'recipes': (RecipeViewSet, '/api/recipes/'),
+    'users': (UserViewSet, '/api/users/'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает ModelSerializer и сериализацию из .values() на '
+        'страницах списков рецептов и пользователей: время на элемент '
+        '(вместе с запросами к БД и кешем карточек рецептов) и число '
+        'запросов на первом вызове. Завершается ошибкой, если ответы '
+        'различаются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=100,
+            help='Размер страницы.'
+        )
+        parser.add_argument(
+            '--username',
+            help='Пользователь, от имени которого строится ответ '
+                 '(флаги избранного, корзины и подписок).'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=50,
+            help='Количество замеров для каждого способа.'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=5,
+            help='Прогревочные вызовы, не попадающие в статистику.'
+        )
+
+    def get_view(self, viewset, path, user):
+        request = APIRequestFactory().get(path)
+        view = viewset(action_map={'get': 'list'})
+        view.setup(request)
+        view.request = view.initialize_request(request)
+        view.request.user = user or AnonymousUser()
+        view.action = 'list'
+        view.format_kwarg = None
+        return view
+
+    def handle(self, *args, **options):
+        user = None
+        if options['username']:
+            user = User.objects.filter(
+                username=options['username']
+            ).first()
+            if user is None:
+                raise CommandError(
+                    f'Пользователь {options["username"]} не найден.'
+                )
+        renderer = ORJSONRenderer()
+        limit = options['limit']
+        for name, (viewset, path) in VIEWSETS.items():
+            view = self.get_view(
+                viewset, f'{path}?limit={limit}', user
+            )
+            queryset = view.filter_queryset(view.get_queryset())
+            values_serializer = view.values_serializer_class(view.request)
+            rows = queryset.prefetch_related(None).values(
+                *values_serializer.fields
+            )
+
+            def model_serializer():
+                return view.get_serializer(
+                    list(queryset[:limit]), many=True
+                ).data
+
+            def values():
+                return values_serializer.serialize(list(rows[:limit]))
+
+            modes = {'ModelSerializer': model_serializer, 'values': values}
+            rendered = set()
+            results = {}
+            for mode, func in modes.items():
+                with CaptureQueriesContext(connection) as context:
+                    data = func()
+                rendered.add(renderer.render(data))
+                stats = summarize(time_call(
+                    func, options['iterations'], options['warmup']
+                ))
+                stats['queries'] = len(context.captured_queries)
+                stats['items'] = len(data)
+                results[mode] = stats
+            if len(rendered) != 1:
+                raise CommandError(f'{name}: ответы различаются.')
+
+            self.stdout.write(f'{name} (элементов: {stats["items"]})')
+            for mode, stats in results.items():
+                per_item = stats['p50'] * 1000 / max(stats['items'], 1)
+                self.stdout.write(
+                    f'  {mode:<16} p50={stats["p50"]:.3f} мс, '
+                    f'{per_item:.1f} мкс на элемент, '
+                    f'запросов: {stats["queries"]}'
+                )
+            slow, fast = results.values()
+            self.stdout.write(self.style.SUCCESS(
+                f'  быстрее в {slow["p50"] / max(fast["p50"], 0.001):.1f} '
+                'раза'
+            ))
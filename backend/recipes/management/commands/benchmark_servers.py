@@ -0,0 +1,65 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from foodgram_backend.loadtest import compare_servers
+
+
+def parse_target(value):
+    label, _, url = value.partition('=')
+    if not label or not url.startswith('http'):
+        raise CommandError(f'Некорректный --target: {value}')
+    return label, url
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает запущенные серверы (например, WSGI и ASGI) при большом '
+        'числе медленных клиентов: пропускная способность и p50/p95/p99 '
+        'обычных запросов, пока медленные клиенты держат соединения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target', action='append', required=True,
+            help='Сервер в виде метка=адрес, например '
+                 'wsgi=http://127.0.0.1:8001. Можно указать несколько.'
+        )
+        parser.add_argument(
+            '--path', action='append',
+            help='Запрашиваемые адреса, по умолчанию /api/recipes/, '
+                 '/api/tags/ и /api/ingredients/?name=%%D0%%B0.'
+        )
+        parser.add_argument('--slow-clients', type=int, default=100)
+        parser.add_argument(
+            '--slow-delay', type=float, default=0.5,
+            help='Пауза медленного клиента между порциями данных, с.'
+        )
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument(
+            '--duration', type=int, default=30,
+            help='Длительность замера для каждого сервера, с.'
+        )
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument('--output', help='Сохранить результат в JSON.')
+
+    def handle(self, *args, **options):
+        options['targets'] = [
+            parse_target(value) for value in options['target']
+        ]
+        options['paths'] = options['path'] or [
+            '/api/recipes/', '/api/tags/', '/api/ingredients/?name=%D0%B0'
+        ]
+        results = compare_servers(options)
+
+        self.stdout.write('{:<12}{:>10}{:>9}{:>9}{:>9}{:>9}'.format(
+            'Сервер', 'запр./с', 'p50', 'p95', 'p99', 'ошибки'
+        ))
+        for label, result in results.items():
+            self.stdout.write(
+                '{:<12}{throughput:>10}{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}'
+                '{error_rate:>9.2%}'.format(label, **result['totals'])
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2,
+                          sort_keys=True)
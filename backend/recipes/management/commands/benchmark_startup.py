@@ -0,0 +1,65 @@
+from collections import Counter
+from statistics import median
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from foodgram_backend.benchmark import BenchmarkError, measure_startup
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет холодный старт: импорт проекта, django.setup() и '
+        'загрузку URLconf в отдельном процессе и показывает самые '
+        'тяжёлые пакеты по -X importtime. Бюджет STARTUP_BUDGET_MS '
+        'проверяет тест foodgram_backend.tests.StartupTests.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=5,
+            help='Количество запусков процесса.'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=15,
+            help='Сколько строк выводить в отчёте по импортам.'
+        )
+
+    def run(self, *flags):
+        try:
+            return measure_startup(*flags)
+        except BenchmarkError as error:
+            raise CommandError(str(error))
+
+    def handle(self, *args, **options):
+        _, _, report = self.run('-X', 'importtime')
+        packages = Counter()
+        modules = []
+        for line in report.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            own, cumulative, name = line[len('import time:'):].split('|')
+            packages[name.strip().split('.')[0]] += int(own)
+            modules.append((int(cumulative), name.strip()))
+
+        self.stdout.write('Собственное время импорта по пакетам, мс:')
+        for package, own in packages.most_common(options['limit']):
+            self.stdout.write(f'{own / 1000:8.1f}  {package}')
+        self.stdout.write('\nМодули с наибольшим временем с вложенными, мс:')
+        modules.sort(reverse=True)
+        for cumulative, name in modules[:options['limit']]:
+            self.stdout.write(f'{cumulative / 1000:8.1f}  {name}')
+
+        durations = [self.run()[0] for _ in range(options['runs'])]
+        startup = median(durations)
+        self.stdout.write(
+            f'\nСтарт: медиана {startup:.0f} мс, '
+            f'min {min(durations):.0f} мс, max {max(durations):.0f} мс '
+            f'({options["runs"]} запусков)'
+        )
+        self.stdout.write(
+            f'Бюджет STARTUP_BUDGET_MS: {settings.STARTUP_BUDGET_MS} мс.'
+        )
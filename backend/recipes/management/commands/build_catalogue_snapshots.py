@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from recipes.snapshots import build_snapshots, get_snapshot_root
+
+
+class Command(BaseCommand):
+    help = (
+        'Записывает в STATIC_ROOT снимки списков тегов и ингредиентов '
+        '(JSON, .gz и .br) и manifest.json с их текущими именами. '
+        'Запускается после collectstatic; дальше снимки обновляются '
+        'сами при изменении каталога.'
+    )
+
+    def handle(self, *args, **options):
+        manifest = build_snapshots()
+        root = get_snapshot_root()
+        for name, filename in manifest.items():
+            self.stdout.write(f'{name}: {root / filename}')
@@ -0,0 +1,26 @@
+import sys
+
+from django.core.management.base import BaseCommand
+from recipes.catalogue import iter_ndjson
+from recipes.constants import CATALOGUE_EXPORT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Выгружает все рецепты в NDJSON: одна строка — один рецепт.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            help='Файл для выгрузки, по умолчанию stdout.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CATALOGUE_EXPORT_CHUNK_SIZE,
+            help='Сколько рецептов читать из курсора за раз.'
+        )
+
+    def handle(self, *args, **options):
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.writelines(iter_ndjson(options['chunk_size']))
+        else:
+            sys.stdout.writelines(iter_ndjson(options['chunk_size']))
@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from recipes.datagen import (CART_PER_USER, FAVORITES_PER_USER,
+                             SUBSCRIPTIONS_PER_USER, CopyDatasetGenerator)
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует воспроизводимый набор пользователей, рецептов, '
+        'избранного, корзин и подписок через PostgreSQL COPY.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--recipes', type=int, default=1_000_000)
+        parser.add_argument(
+            '--favorites', type=int, default=FAVORITES_PER_USER,
+            help='Среднее число рецептов в избранном у пользователя.'
+        )
+        parser.add_argument(
+            '--cart', type=int, default=CART_PER_USER,
+            help='Среднее число рецептов в списке покупок.'
+        )
+        parser.add_argument(
+            '--subscriptions', type=int, default=SUBSCRIPTIONS_PER_USER,
+            help='Среднее число подписок у пользователя.'
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--batch-size', type=int, default=100_000,
+            help='Строк в одной команде COPY.'
+        )
+        parser.add_argument(
+            '--drop-indexes', action='store_true',
+            help='Снять вторичные индексы на время загрузки и создать '
+                 'их заново в конце.'
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 1:
+            raise CommandError('Нужен хотя бы один пользователь.')
+        start = time.perf_counter()
+        generator = CopyDatasetGenerator(
+            users=options['users'],
+            recipes=options['recipes'],
+            favorites=options['favorites'],
+            cart=options['cart'],
+            subscriptions=options['subscriptions'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            drop_indexes=options['drop_indexes'],
+            log=self.stdout.write,
+        )
+        try:
+            rows = generator.generate()
+        except RuntimeError as error:
+            raise CommandError(str(error))
+        self.stdout.write(self.style.SUCCESS(
+            'Загружено строк: {} за {:.1f} с'.format(
+                sum(rows.values()), time.perf_counter() - start
+            )
+        ))
@@ -0,0 +1,39 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from recipes.importers import import_ingredients_file
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает ингредиенты из CSV (name,measurement_unit) или JSON '
+        'с удалением дубликатов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу.')
+        parser.add_argument(
+            '--format', choices=('csv', 'json'),
+            help='Формат файла, по умолчанию — по расширению.'
+        )
+        parser.add_argument(
+            '--delete', action='store_true',
+            help='Удалить файл после импорта (загрузка из админки).'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            result = import_ingredients_file(
+                options['path'], options['format']
+            )
+        except (OSError, ValueError) as error:
+            raise CommandError(
+                f'Импорт ингредиентов из {options["path"]} не удался: {error}'
+            )
+        finally:
+            if options['delete']:
+                Path(options['path']).unlink(missing_ok=True)
+        self.stdout.write(self.style.SUCCESS(
+            f'Прочитано: {result.read}, добавлено: {result.inserted}, '
+            f'пропущено: {result.skipped}, некорректных: {result.invalid}'
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from recipes.catalogue import import_ndjson
+from recipes.constants import CATALOGUE_IMPORT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает рецепты из NDJSON, выгруженного export_recipes. '
+        'Авторы ищутся по username, недостающие теги и ингредиенты '
+        'создаются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу NDJSON.')
+        parser.add_argument(
+            '--batch-size', type=int, default=CATALOGUE_IMPORT_BATCH_SIZE,
+            help='Сколько рецептов вставлять за раз.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], encoding='utf-8') as stream:
+                result = import_ndjson(stream, options['batch_size'])
+        except (OSError, ValueError, KeyError) as error:
+            raise CommandError(f'Ошибка загрузки: {error!r}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Прочитано: {result.read}, создано: {result.created}, '
+            f'пропущено без автора: {result.skipped}'
+        ))
@@ -0,0 +1,88 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from foodgram_backend.loadtest import SESSION_WEIGHTS, compare, run_load
+
+
+def parse_weights(value):
+    weights = dict(SESSION_WEIGHTS)
+    if not value:
+        return weights
+    weights = {name: 0 for name in weights}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in weights or not weight.isdigit():
+            raise CommandError(f'Некорректный сценарий в --mix: {item}')
+        weights[name] = int(weight)
+    return weights
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест запущенного сервера: виртуальные пользователи '
+        'проигрывают сценарии API, результат — пропускная способность, '
+        'p50/p95/p99 и доля ошибок по каждому эндпоинту.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url', default='http://127.0.0.1:9000',
+            help='Адрес сервера.'
+        )
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument(
+            '--duration', type=int, default=60,
+            help='Длительность теста после разгона, с.'
+        )
+        parser.add_argument(
+            '--ramp-up', type=int, default=5,
+            help='За сколько секунд запустить всех пользователей.'
+        )
+        parser.add_argument(
+            '--think-time', type=float, default=0.5,
+            help='Средняя пауза между запросами пользователя, с.'
+        )
+        parser.add_argument(
+            '--mix',
+            help='Веса сценариев, например browse=60,filter=20,cart=20. '
+                 'Доступны: {}.'.format(', '.join(SESSION_WEIGHTS))
+        )
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help='Сохранить результат в JSON.')
+        parser.add_argument(
+            '--compare', help='JSON прошлого прогона для сравнения.'
+        )
+
+    def handle(self, *args, **options):
+        options['weights'] = parse_weights(options['mix'])
+        if not any(options['weights'].values()):
+            raise CommandError('Все веса сценариев нулевые.')
+        result = run_load(options)
+
+        totals = result['totals']
+        self.stdout.write(
+            'Запросов: {requests}, ошибок: {errors} ({error_rate:.2%}), '
+            '{throughput} запр./с'.format(**totals)
+        )
+        self.stdout.write('\n{:<44}{:>8}{:>9}{:>9}{:>9}{:>9}'.format(
+            'Эндпоинт', 'запр./с', 'p50', 'p95', 'p99', 'ошибки'
+        ))
+        for name, stats in sorted(result['endpoints'].items()):
+            self.stdout.write(
+                '{:<44}{:>8}{:>9.1f}{:>9.1f}{:>9.1f}{:>9.2%}'.format(
+                    name, stats['throughput'], stats['p50'], stats['p95'],
+                    stats['p99'], stats['error_rate']
+                )
+            )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(result, file, ensure_ascii=False, indent=2,
+                          sort_keys=True)
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                previous = json.load(file)
+            self.stdout.write('\nСравнение с ' + options['compare'])
+            for line in compare(result, previous):
+                self.stdout.write(line)
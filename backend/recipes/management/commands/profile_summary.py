@@ -0,0 +1,80 @@
+import os
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from foodgram_backend.profiling import read_dumps
+
+
+class Command(BaseCommand):
+    help = (
+        'Сводка по дампам профайлера: самые горячие функции '
+        'и самые медленные запросы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dir',
+            default=settings.PROFILING_DIR,
+            help='Каталог с дампами.'
+        )
+        parser.add_argument(
+            '--view',
+            help='Учитывать только дампы указанного view.'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Сколько строк выводить в каждой таблице.'
+        )
+
+    def handle(self, *args, **options):
+        if not os.path.isdir(options['dir']):
+            raise CommandError(f'Каталог {options["dir"]} не найден.')
+
+        own = Counter()
+        total = Counter()
+        queries = Counter()
+        requests = []
+        samples_count = 0
+        for dump in read_dumps(options['dir']):
+            if options['view'] and dump['view'] != options['view']:
+                continue
+            requests.append(dump)
+            for entry in dump['stacks']:
+                count = entry['count']
+                samples_count += count
+                own[entry['stack'][-1]] += count
+                for frame in set(entry['stack']):
+                    total[frame] += count
+            for query in dump['queries']:
+                queries[query['sql']] += query['duration_ms']
+
+        if not requests:
+            self.stdout.write('Дампов нет.')
+            return
+
+        self.stdout.write(
+            f'Дампов: {len(requests)}, сэмплов: {samples_count}\n'
+        )
+        self.print_table('Собственное время', own, samples_count, options)
+        self.print_table('Время с вложенными', total, samples_count, options)
+
+        self.stdout.write('\nSQL с наибольшим суммарным временем, мс:')
+        for sql, duration in queries.most_common(options['limit']):
+            self.stdout.write(f'{duration:10.1f}  {sql[:150]}')
+
+        self.stdout.write('\nСамые медленные запросы, мс:')
+        requests.sort(key=lambda dump: dump['duration_ms'], reverse=True)
+        for dump in requests[:options['limit']]:
+            self.stdout.write(
+                f'{dump["duration_ms"]:10.1f}  {dump["method"]} '
+                f'{dump["path"]} ({dump["reason"]}, {dump["timestamp"]})'
+            )
+
+    def print_table(self, title, counter, samples_count, options):
+        self.stdout.write(f'\n{title}, % сэмплов:')
+        for frame, count in counter.most_common(options['limit']):
+            share = count * 100 / samples_count
+            self.stdout.write(f'{share:6.1f}%  {frame}')
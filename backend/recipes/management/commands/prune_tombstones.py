@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from recipes.constants import TOMBSTONE_RETENTION_DAYS
+from recipes.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = 'Удаляет записи об удалениях старше срока хранения.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=TOMBSTONE_RETENTION_DAYS,
+            help='Срок хранения в днях.'
+        )
+
+    def handle(self, *args, **options):
+        border = timezone.now() - timedelta(days=options['days'])
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=border).delete()
+        self.stdout.write(f'Удалено записей: {deleted}')
@@ -0,0 +1,6 @@
+from foodgram_backend.memberships import Membership
+
+from .models import Favorite, ShoppingCart
+
+FAVORITES = Membership('favorites', Favorite, 'recipe_id')
+SHOPPING_CART = Membership('shopping_cart', ShoppingCart, 'recipe_id')
@@ -0,0 +1,57 @@
+# Generated by Django 5.0 on 2026-10-19 07:56
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции.
+    atomic = False
+
+    dependencies = [
+        ('recipes', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='favorite',
+            index=models.Index(
+                fields=['user', '-created_at'],
+                include=('recipe',),
+                name='favorite_user_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='ingredient',
+            index=models.Index(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            'name', models.TextField())),
+                    name='text_pattern_ops'),
+                name='ingredient_name_upper_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(
+                fields=['-created_at'],
+                name='recipe_created_at_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(
+                fields=['author', '-created_at'],
+                name='recipe_author_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='shoppingcart',
+            index=models.Index(
+                fields=['user', '-added_at'],
+                include=('recipe',),
+                name='cart_user_added_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.0 on 2026-10-19 07:58
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции.
+    atomic = False
+
+    dependencies = [
+        ('recipes', '0003_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True,
+                 primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(
+                    choices=[
+                        ('recipe', 'Рецепт'),
+                        ('favorite', 'Избранное'),
+                        ('shopping_cart', 'Список покупок')],
+                    max_length=32, verbose_name='Тип')),
+                ('object_id', models.BigIntegerField(
+                    verbose_name='id рецепта')),
+                ('user_id', models.BigIntegerField(
+                    blank=True, null=True, verbose_name='id пользователя')),
+                ('deleted_at', models.DateTimeField(
+                    auto_now_add=True, verbose_name='Дата удаления')),
+            ],
+            options={
+                'verbose_name': 'Удалённый объект',
+                'verbose_name_plural': 'Удалённые объекты',
+                'ordering': ('deleted_at',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(
+                fields=['deleted_at'],
+                name='tombstone_deleted_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(
+                fields=['user_id', 'deleted_at'],
+                name='tombstone_user_deleted_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(
+                fields=['updated_at'],
+                name='recipe_updated_at_idx'),
+        ),
+    ]
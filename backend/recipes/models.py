@@ -1,11 +1,14 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import OpClass
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models.functions import Cast, Upper
 
 from .constants import (INGREDIENT_NAME_MAX_LENGTH,
                         MEASUREMENT_UNIT_MAX_LENGTH, MIN_COOKING_TIME,
                         MIN_INGREDIENT_AMOUNT, RECIPE_NAME_MAX_LENGTH,
-                        TAG_NAME_MAX_LENGTH, TAG_SLUG_MAX_LENGTH)
+                        TAG_NAME_MAX_LENGTH, TAG_SLUG_MAX_LENGTH,
+                        TOMBSTONE_KIND_MAX_LENGTH)
 
 User = get_user_model()
 
@@ -51,6 +54,16 @@ class Ingredient(models.Model):
                 name='unique_ingredient'
             )
         ]
+        indexes = [
+            # Поиск по началу названия (SearchFilter '^name').
+            models.Index(
+                OpClass(
+                    Upper(Cast('name', models.TextField())),
+                    name='text_pattern_ops'
+                ),
+                name='ingredient_name_upper_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.name}, {self.measurement_unit}'
@@ -100,6 +113,20 @@ class Recipe(models.Model):
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
         ordering = ('-created_at',)
+        indexes = [
+            models.Index(
+                fields=['-created_at'],
+                name='recipe_created_at_idx'
+            ),
+            models.Index(
+                fields=['author', '-created_at'],
+                name='recipe_author_created_idx'
+            ),
+            models.Index(
+                fields=['updated_at'],
+                name='recipe_updated_at_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -175,6 +202,13 @@ class Favorite(models.Model):
                 name='unique_favorite'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['user', '-created_at'],
+                include=['recipe'],
+                name='favorite_user_created_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.user} добавил в избранное {self.recipe}'
@@ -208,6 +242,63 @@ class ShoppingCart(models.Model):
                 name='unique_shopping_cart'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['user', '-added_at'],
+                include=['recipe'],
+                name='cart_user_added_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.user} добавил в корзину {self.recipe}'
+
+
+class Tombstone(models.Model):
+    """
+    Запись об удалении рецепта или связи с ним, по которой клиенты
+    синхронизируются инкрементально.
+    """
+    RECIPE = 'recipe'
+    FAVORITE = 'favorite'
+    SHOPPING_CART = 'shopping_cart'
+    KIND_CHOICES = (
+        (RECIPE, 'Рецепт'),
+        (FAVORITE, 'Избранное'),
+        (SHOPPING_CART, 'Список покупок'),
+    )
+
+    kind = models.CharField(
+        'Тип',
+        max_length=TOMBSTONE_KIND_MAX_LENGTH,
+        choices=KIND_CHOICES
+    )
+    object_id = models.BigIntegerField('id рецепта')
+    # Не ForeignKey: запись должна пережить удаление самого пользователя.
+    user_id = models.BigIntegerField(
+        'id пользователя',
+        null=True,
+        blank=True
+    )
+    deleted_at = models.DateTimeField(
+        'Дата удаления',
+        auto_now_add=True
+    )
+
+    class Meta:
+        verbose_name = 'Удалённый объект'
+        verbose_name_plural = 'Удалённые объекты'
+        ordering = ('deleted_at',)
+        indexes = [
+            models.Index(
+                fields=['deleted_at'],
+                name='tombstone_deleted_at_idx'
+            ),
+            models.Index(
+                fields=['user_id', 'deleted_at'],
+                name='tombstone_user_deleted_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.get_kind_display()} {self.object_id}'
@@ -1,9 +1,11 @@
 from django.db import transaction
 from drf_extra_fields.fields import Base64ImageField
+from foodgram_backend.memberships import get_viewer_memberships
 from rest_framework import serializers
+from users.serializers import UserSerializer
 
-from .models import (Favorite, Ingredient, IngredientInRecipe, Recipe,
-                     ShoppingCart, Tag)
+from .memberships import FAVORITES, SHOPPING_CART
+from .models import Ingredient, IngredientInRecipe, Recipe, Tag
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -47,7 +49,7 @@ class RecipeMinifiedSerializer(serializers.ModelSerializer):
 
 
 class RecipeListSerializer(serializers.ModelSerializer):
-    author = serializers.SerializerMethodField()
+    author = UserSerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
     ingredients = IngredientInRecipeSerializer(
         source='ingredient_amounts',
@@ -73,27 +75,13 @@ class RecipeListSerializer(serializers.ModelSerializer):
             'cooking_time'
         )
 
-    def get_author(self, obj):
-        from users.serializers import UserSerializer
-        return UserSerializer(obj.author, context=self.context).data
-
     def get_is_favorited(self, obj):
-        request = self.context.get('request')
-        if not request or not request.user.is_authenticated:
-            return False
-        return Favorite.objects.filter(
-            user=request.user,
-            recipe=obj
-        ).exists()
+        ids, = get_viewer_memberships(self.context, FAVORITES)
+        return obj.id in ids
 
     def get_is_in_shopping_cart(self, obj):
-        request = self.context.get('request')
-        if not request or not request.user.is_authenticated:
-            return False
-        return ShoppingCart.objects.filter(
-            user=request.user,
-            recipe=obj
-        ).exists()
+        ids, = get_viewer_memberships(self.context, SHOPPING_CART)
+        return obj.id in ids
 
     def get_image(self, obj):
         if obj.image:
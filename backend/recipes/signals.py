@@ -0,0 +1,101 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from users.models import User
+
+from .fragments import AUTHOR_FIELDS, invalidate_fragments
+from .memberships import FAVORITES, SHOPPING_CART
+from .models import (Favorite, Ingredient, IngredientInRecipe, Recipe,
+                     ShoppingCart, Tag, Tombstone)
+from .snapshots import rebuild_snapshots_on_commit
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    Tombstone.objects.create(kind=Tombstone.RECIPE, object_id=instance.id)
+
+
+@receiver(post_delete, sender=Favorite)
+def favorite_deleted(sender, instance, **kwargs):
+    Tombstone.objects.create(
+        kind=Tombstone.FAVORITE,
+        object_id=instance.recipe_id,
+        user_id=instance.user_id
+    )
+
+
+@receiver(post_delete, sender=ShoppingCart)
+def shopping_cart_deleted(sender, instance, **kwargs):
+    Tombstone.objects.create(
+        kind=Tombstone.SHOPPING_CART,
+        object_id=instance.recipe_id,
+        user_id=instance.user_id
+    )
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipe_fragment(sender, instance, **kwargs):
+    invalidate_fragments([instance.id])
+
+
+@receiver(post_save, sender=IngredientInRecipe)
+@receiver(post_delete, sender=IngredientInRecipe)
+def invalidate_ingredient_amount_fragment(sender, instance, **kwargs):
+    invalidate_fragments([instance.recipe_id])
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_recipe_tags_fragments(sender, instance, action, reverse,
+                                     pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        invalidate_fragments([instance.id])
+    elif action == 'pre_clear':
+        invalidate_fragments(instance.recipes.values_list('id', flat=True))
+    else:
+        invalidate_fragments(pk_set)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def invalidate_tag_fragments(sender, instance, **kwargs):
+    invalidate_fragments(instance.recipes.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Ingredient)
+def invalidate_ingredient_fragments(sender, instance, **kwargs):
+    invalidate_fragments(
+        instance.ingredient_amounts.values_list('recipe_id', flat=True)
+    )
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def rebuild_catalogue_snapshots(sender, **kwargs):
+    rebuild_snapshots_on_commit()
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_fragments(sender, instance, created, update_fields,
+                                **kwargs):
+    # Вход пользователя обновляет только last_login.
+    if created or (update_fields
+                   and not set(update_fields) & set(AUTHOR_FIELDS)):
+        return
+    invalidate_fragments(instance.recipes.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def invalidate_favorites(sender, instance, **kwargs):
+    FAVORITES.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=ShoppingCart)
+@receiver(post_delete, sender=ShoppingCart)
+def invalidate_shopping_cart(sender, instance, **kwargs):
+    SHOPPING_CART.invalidate(instance.user_id)
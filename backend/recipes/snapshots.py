@@ -0,0 +1,189 @@
+"""
+Статические снимки каталога: списки тегов и ингредиентов в виде
+JSON-файлов в STATIC_ROOT, которые отдаёт nginx.
+
+Имя файла содержит хеш содержимого, поэтому файл не меняется и
+кешируется навсегда; рядом лежат сжатые копии .gz и .br. Актуальные
+имена хранятся в manifest.json, по нему API перенаправляет клиентов.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import weakref
+from contextvars import ContextVar
+from pathlib import Path
+
+import brotli
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponseRedirect
+from foodgram_backend.renderers import ORJSONRenderer
+
+from .constants import (CATALOGUE_SNAPSHOT_DIR, CATALOGUE_SNAPSHOT_FILE_MODE,
+                        CATALOGUE_SNAPSHOT_MANIFEST,
+                        CATALOGUE_SNAPSHOT_VERSION_LENGTH)
+from .models import Ingredient, Tag
+from .serializers import IngredientSerializer, TagSerializer
+
+logger = logging.getLogger(__name__)
+
+# Те же данные, что отдают TagViewSet и IngredientViewSet без поиска.
+SNAPSHOTS = {
+    'tags': (Tag.objects.all, TagSerializer),
+    'ingredients': (lambda: Ingredient.objects.order_by('name'),
+                    IngredientSerializer),
+}
+
+_manifest_cache = {'mtime': None, 'manifest': {}}
+# Колбэк пересборки, уже зарегистрированный в текущей транзакции.
+_pending_rebuild = ContextVar('pending_snapshot_rebuild', default=None)
+
+
+def get_snapshot_root():
+    return Path(settings.STATIC_ROOT) / CATALOGUE_SNAPSHOT_DIR
+
+
+def render_snapshot(name):
+    get_queryset, serializer_class = SNAPSHOTS[name]
+    return ORJSONRenderer().render(
+        serializer_class(get_queryset(), many=True).data
+    )
+
+
+def write_file(path, data):
+    """
+    Запись через временный файл: nginx не увидит файл недописанным.
+    У каждого процесса свой временный файл, поэтому воркеры, которые
+    пересобирают снимки одновременно, не пишут в один и тот же.
+    """
+    with tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp',
+        delete=False
+    ) as temp_file:
+        temp_file.write(data)
+    try:
+        # NamedTemporaryFile создаёт файл с правами 0600.
+        os.chmod(temp_file.name, CATALOGUE_SNAPSHOT_FILE_MODE)
+        os.replace(temp_file.name, path)
+    except OSError:
+        os.unlink(temp_file.name)
+        raise
+
+
+def read_manifest(root=None):
+    try:
+        return json.loads(
+            ((root or get_snapshot_root()) / CATALOGUE_SNAPSHOT_MANIFEST)
+            .read_text()
+        )
+    except (OSError, ValueError):
+        return {}
+
+
+def build_snapshots():
+    """
+    Пишет снимки, которых ещё нет, и обновляет manifest.json. Кроме
+    текущей версии хранится предыдущая: по ней могли только что
+    перенаправить клиента.
+    """
+    root = get_snapshot_root()
+    root.mkdir(parents=True, exist_ok=True)
+    previous = read_manifest(root)
+    manifest = {}
+    for name in SNAPSHOTS:
+        data = render_snapshot(name)
+        version = hashlib.sha256(data).hexdigest()[
+            :CATALOGUE_SNAPSHOT_VERSION_LENGTH
+        ]
+        filename = f'{name}.{version}.json'
+        path = root / filename
+        if not path.exists():
+            write_file(path.with_name(f'{filename}.gz'),
+                       gzip.compress(data, compresslevel=9, mtime=0))
+            write_file(path.with_name(f'{filename}.br'),
+                       brotli.compress(data, mode=brotli.MODE_TEXT))
+            write_file(path, data)
+        manifest[name] = filename
+    write_file(
+        root / CATALOGUE_SNAPSHOT_MANIFEST,
+        json.dumps(manifest, indent=2).encode()
+    )
+    keep = set(manifest.values()) | set(previous.values())
+    for path in root.glob('*.json*'):
+        if (path.name != CATALOGUE_SNAPSHOT_MANIFEST
+                and path.name.split('.')[0] in SNAPSHOTS
+                and path.name.removesuffix('.gz').removesuffix('.br')
+                not in keep):
+            path.unlink(missing_ok=True)
+    return manifest
+
+
+def rebuild_snapshots():
+    """
+    Пересборка после изменения каталога. Если записать снимки не
+    удалось, manifest.json удаляется и API отдаёт каталог само.
+    """
+    if not settings.CATALOGUE_SNAPSHOTS_ENABLED:
+        return
+    try:
+        build_snapshots()
+    except Exception:
+        logger.exception('Не удалось обновить снимки каталога')
+        (get_snapshot_root() / CATALOGUE_SNAPSHOT_MANIFEST).unlink(
+            missing_ok=True
+        )
+
+
+def rebuild_snapshots_on_commit():
+    """
+    Пересборка после коммита, одна на транзакцию: при сохранении
+    многих тегов или ингредиентов сигналы приходят на каждый объект.
+    """
+    if not settings.CATALOGUE_SNAPSHOTS_ENABLED:
+        return
+    pending = _pending_rebuild.get()
+    if pending is not None and pending() is not None:
+        return
+
+    def rebuild():
+        _pending_rebuild.set(None)
+        rebuild_snapshots()
+
+    # Слабая ссылка: при откате Django отбрасывает колбэк, ссылка
+    # обнуляется, и следующая транзакция зарегистрирует свой.
+    _pending_rebuild.set(weakref.ref(rebuild))
+    transaction.on_commit(rebuild)
+
+
+def get_manifest():
+    """manifest.json, перечитывается только после изменения файла."""
+    try:
+        mtime = (
+            get_snapshot_root() / CATALOGUE_SNAPSHOT_MANIFEST
+        ).stat().st_mtime_ns
+    except OSError:
+        return {}
+    if mtime != _manifest_cache['mtime']:
+        _manifest_cache['manifest'] = read_manifest()
+        _manifest_cache['mtime'] = mtime
+    return _manifest_cache['manifest']
+
+
+def get_snapshot_redirect(request, name):
+    """
+    Перенаправление на снимок для запроса всего списка (без поиска и
+    других параметров) или None, если ответ нужно собрать.
+    """
+    if (not settings.CATALOGUE_SNAPSHOTS_ENABLED
+            or any(request.GET.values())
+            or 'text/html' in request.headers.get('Accept', '')):
+        return None
+    filename = get_manifest().get(name)
+    if filename is None:
+        return None
+    return HttpResponseRedirect(
+        f'{settings.STATIC_URL}{CATALOGUE_SNAPSHOT_DIR}/{filename}'
+    )
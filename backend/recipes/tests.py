@@ -0,0 +1,97 @@
+from unittest import mock, skipUnless
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from users.models import Subscription
+
+from . import snapshots
+from .models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
+
+SAMPLE_ID = 1
+
+
+def get_hot_queries():
+    """Горячие запросы API и индексы, которые они должны использовать."""
+    return (
+        (
+            'Список рецептов',
+            Recipe.objects.all()[:6],
+            'recipe_created_at_idx',
+        ),
+        (
+            'Рецепты автора',
+            Recipe.objects.filter(author_id=SAMPLE_ID)[:6],
+            'recipe_author_created_idx',
+        ),
+        (
+            'Избранное пользователя',
+            Favorite.objects.filter(
+                user_id=SAMPLE_ID
+            ).values_list('recipe_id', flat=True),
+            'favorite_user_created_idx',
+        ),
+        (
+            'Список покупок пользователя',
+            ShoppingCart.objects.filter(
+                user_id=SAMPLE_ID
+            ).values_list('recipe_id', flat=True),
+            'cart_user_added_idx',
+        ),
+        (
+            'Подписчики автора',
+            Subscription.objects.filter(
+                author_id=SAMPLE_ID
+            ).values_list('user_id', flat=True),
+            'subscription_author_user_idx',
+        ),
+        (
+            'Поиск ингредиента по началу названия',
+            Ingredient.objects.filter(name__istartswith='а'),
+            'ingredient_name_upper_idx',
+        ),
+    )
+
+
+@skipUnless(
+    connection.vendor == 'postgresql', 'Планы проверяются на PostgreSQL.'
+)
+class HotQueryPlanTests(TestCase):
+    """Горячие запросы API используют предназначенные для них индексы."""
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            # На пустых таблицах планировщик предпочтёт seq scan, поэтому
+            # проверяем, какой индекс он выберет при прочих равных.
+            # SET LOCAL действует до отката транзакции теста.
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def test_hot_queries_use_indexes(self):
+        for title, queryset, index_name in get_hot_queries():
+            with self.subTest(title):
+                plan = queryset.explain()
+                self.assertIn(index_name, plan, plan)
+
+
+@override_settings(CATALOGUE_SNAPSHOTS_ENABLED=True)
+@mock.patch.object(snapshots, 'rebuild_snapshots')
+class SnapshotRebuildTests(TransactionTestCase):
+    """Снимки каталога пересобираются один раз на транзакцию."""
+
+    def create_tags(self, count):
+        for number in range(count):
+            Tag.objects.create(name=f'Тег {number}', slug=f'tag-{number}')
+
+    def test_one_rebuild_per_transaction(self, rebuild):
+        with transaction.atomic():
+            self.create_tags(5)
+        rebuild.assert_called_once_with()
+
+    def test_rebuild_after_rolled_back_transaction(self, rebuild):
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                self.create_tags(1)
+                raise ValueError
+        rebuild.assert_not_called()
+        with transaction.atomic():
+            self.create_tags(1)
+        rebuild.assert_called_once_with()
@@ -1,6 +1,9 @@
+from django.conf import settings
 from django.urls import include, path
+from foodgram_backend.async_views import async_get, get_router_views
 from rest_framework.routers import DefaultRouter
 
+from . import async_views
 from .views import IngredientViewSet, RecipeViewSet, TagViewSet
 
 router = DefaultRouter()
@@ -11,3 +14,40 @@ router.register('recipes', RecipeViewSet, basename='recipes')
 urlpatterns = [
     path('', include(router.urls)),
 ]
+
+if settings.ASYNC_READ_VIEWS:
+    views = get_router_views(router)
+    urlpatterns = [
+        path(
+            'tags/',
+            async_get(async_views.tag_list, views['tags-list']),
+            name='tags-list'
+        ),
+        path(
+            'tags/<int:pk>/',
+            async_get(async_views.tag_detail, views['tags-detail']),
+            name='tags-detail'
+        ),
+        path(
+            'ingredients/',
+            async_get(async_views.ingredient_list, views['ingredients-list']),
+            name='ingredients-list'
+        ),
+        path(
+            'ingredients/<int:pk>/',
+            async_get(
+                async_views.ingredient_detail, views['ingredients-detail']
+            ),
+            name='ingredients-detail'
+        ),
+        path(
+            'recipes/',
+            async_get(async_views.recipe_list, views['recipes-list']),
+            name='recipes-list'
+        ),
+        path(
+            'recipes/<int:pk>/',
+            async_get(async_views.recipe_detail, views['recipes-detail']),
+            name='recipes-detail'
+        ),
+    ] + urlpatterns
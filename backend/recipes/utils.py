@@ -1,45 +1,14 @@
+import hashlib
+
 from django.apps import apps
-from django.db.models import Sum
-from import_export import resources
-from import_export.fields import Field
-
-from .models import Ingredient
-
-
-class IngredientImportCSV(resources.ModelResource):
-
-    name = Field(attribute='name', column_name='name')
-    measurement_unit = Field(
-        attribute='measurement_unit',
-        column_name='measurement_unit')
-
-    class Meta:
-        model = Ingredient
-        fields = ('name', 'measurement_unit')
-        import_id_fields = ('name', 'measurement_unit')
-        skip_unchanged = False
-        report_skipped = False
-
-    def import_data(self, dataset, dry_run=False,
-                    raise_errors=False, use_transactions=None, **kwargs):
-        if not dataset.headers or len(dataset.headers) == 0:
-            dataset.headers = ['name', 'measurement_unit']
-
-        elif len(dataset.headers) == 2:
-            first_header = str(
-                dataset.headers[0]).strip() if dataset.headers[0] else ''
-            if first_header and any(
-                    '\u0400' <= char <= '\u04FF' for char in first_header):
-                first_row_data = [dataset.headers[0], dataset.headers[1]]
-                dataset.headers = ['name', 'measurement_unit']
-                dataset.insert(0, first_row_data)
-
-        return super().import_data(
-            dataset, dry_run,
-            raise_errors,
-            use_transactions,
-            **kwargs
-        )
+from django.core.cache import cache
+from django.db.models import Count, Prefetch, Sum
+
+from .constants import TAG_FACETS_CACHE_PREFIX, TAG_FACETS_CACHE_TIMEOUT
+from .models import IngredientInRecipe, Tag
+
+FACETS_IGNORED_PARAMS = ('page', 'limit', 'facets')
+USER_DEPENDENT_PARAMS = ('is_favorited', 'is_in_shopping_cart')
 
 
 def generate_shopping_cart_file(shopping_cart):
@@ -64,3 +33,65 @@ def generate_shopping_cart_file(shopping_cart):
         lines.append(f'{name} - {amount} {unit}\r\n')
 
     return ''.join(lines)
+
+
+def get_tag_facets_cache_key(request):
+    """Ключ кэша для набора фильтров запроса (без пагинации)."""
+    params = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        if key not in FACETS_IGNORED_PARAMS
+        for value in values
+    )
+    if (request.user.is_authenticated
+            and any(key in USER_DEPENDENT_PARAMS for key, _ in params)):
+        params.append(('user', str(request.user.id)))
+    digest = hashlib.md5(repr(params).encode()).hexdigest()
+    return f'{TAG_FACETS_CACHE_PREFIX}:{digest}'
+
+
+def get_tag_facets(queryset, cache_key):
+    """
+    Количество рецептов по каждому тегу для уже отфильтрованного
+    queryset, одним сгруппированным запросом.
+    """
+    facets = cache.get(cache_key)
+    if facets is None:
+        facets = list(
+            Tag.objects
+            .filter(recipes__in=queryset.order_by().values('id'))
+            .annotate(count=Count('recipes'))
+            .values('id', 'name', 'slug', 'count')
+            .order_by('name')
+        )
+        cache.set(cache_key, facets, TAG_FACETS_CACHE_TIMEOUT)
+    return facets
+
+
+def get_ingredient_amounts_prefetch():
+    # Порядок ингредиентов — порядок добавления в рецепт, как и в
+    # RecipeValuesSerializer.
+    return Prefetch(
+        'ingredient_amounts',
+        queryset=IngredientInRecipe.objects.select_related(
+            'ingredient'
+        ).order_by('id')
+    )
+
+
+def get_sync_cursor(sources, since, cursor, limit):
+    """
+    Курсор синхронизации, при котором в каждом списке (queryset, поле
+    времени) не больше limit записей после since. Записи с одинаковым
+    временем не разделяются: следующий запрос начнётся строго после
+    курсора.
+    """
+    has_more = False
+    for queryset, field in sources:
+        times = list(queryset.filter(**{
+            f'{field}__gt': since, f'{field}__lte': cursor
+        }).order_by(field).values_list(field, flat=True)[:limit + 1])
+        if len(times) > limit:
+            cursor = times[limit - 1]
+            has_more = True
+    return cursor, has_more
@@ -1,49 +1,115 @@
+from datetime import timedelta
+
 from django.db import transaction
-from django.http import HttpResponse
+from django.db.models import Q
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django_filters.rest_framework import DjangoFilterBackend
+from foodgram_backend.mixins import (SparseFieldsMixin, ValuesReadMixin,
+                                     ViewerMembershipsMixin)
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
+from users.memberships import SUBSCRIPTIONS
 
+from .catalogue import iter_ndjson
+from .constants import (RECIPES_BATCH_MAX_SIZE, SYNC_CURSOR_MARGIN,
+                        SYNC_PAGE_SIZE, TOMBSTONE_RETENTION_DAYS)
+from .fast_serializers import RecipeValuesSerializer
 from .filters import RecipeFilter
-from .models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
+from .memberships import FAVORITES, SHOPPING_CART
+from .models import Favorite, Ingredient, Recipe, ShoppingCart, Tag, Tombstone
 from .permissions import IsAuthorOrReadOnly
 from .serializers import (IngredientSerializer, RecipeCreateSerializer,
                           RecipeListSerializer, RecipeMinifiedSerializer,
                           TagSerializer)
-from .utils import generate_shopping_cart_file
+from .snapshots import get_snapshot_redirect
+from .utils import (generate_shopping_cart_file,
+                    get_ingredient_amounts_prefetch, get_sync_cursor,
+                    get_tag_facets, get_tag_facets_cache_key)
+
+
+class SnapshotListMixin:
+    """Список целиком отдаётся редиректом на статический снимок."""
+
+    snapshot_name = None
 
+    def list(self, request, *args, **kwargs):
+        redirect = get_snapshot_redirect(request, self.snapshot_name)
+        if redirect is not None:
+            return redirect
+        return super().list(request, *args, **kwargs)
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+
+class TagViewSet(SnapshotListMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [AllowAny]
     pagination_class = None
+    snapshot_name = 'tags'
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(SnapshotListMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all().order_by('name')
     serializer_class = IngredientSerializer
     permission_classes = [AllowAny]
     pagination_class = None
     filter_backends = [SearchFilter]
     search_fields = ['^name']
+    snapshot_name = 'ingredients'
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(SparseFieldsMixin, ValuesReadMixin, ViewerMembershipsMixin,
+                    viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
     serializer_class = RecipeListSerializer
+    values_serializer_class = RecipeValuesSerializer
+    viewer_memberships = (FAVORITES, SHOPPING_CART, SUBSCRIPTIONS)
     filter_backends = [DjangoFilterBackend]
     filterset_class = RecipeFilter
+    sparse_fields_actions = ('list', 'retrieve', 'batch', 'sync')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in self.sparse_fields_actions:
+            return queryset
+
+        fields = self.get_sparse_fields()
+        if fields is None:
+            fields = set(RecipeListSerializer.Meta.fields)
+        else:
+            queryset = self.defer_sparse_fields(queryset, fields)
+        if 'author' in fields:
+            queryset = queryset.select_related('author')
+        if 'tags' in fields:
+            queryset = queryset.prefetch_related('tags')
+        if 'ingredients' in fields:
+            queryset = queryset.prefetch_related(
+                get_ingredient_amounts_prefetch()
+            )
+        return queryset
 
     def get_filterset_kwargs(self):
         kwargs = super().get_filterset_kwargs()
         kwargs['request'] = self.request
         return kwargs
 
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if ('tags' in request.query_params.getlist('facets')
+                and isinstance(response.data, dict)):
+            response.data['facets'] = {
+                'tags': get_tag_facets(
+                    self.filter_queryset(self.get_queryset()),
+                    get_tag_facets_cache_key(request)
+                )
+            }
+        return response
+
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
             return RecipeCreateSerializer
@@ -54,11 +120,13 @@ class RecipeViewSet(viewsets.ModelViewSet):
             return [IsAuthenticated()]
         if self.action in ['update', 'partial_update', 'destroy']:
             return [IsAuthorOrReadOnly()]
+        if self.action == 'export':
+            return [IsAdminUser()]
         return [AllowAny()]
 
     @staticmethod
     def _add_relation(request, pk, model, filter_kwargs, response_serializer,
-                      response_object, error_message):
+                      response_object, error_message, membership):
         obj = get_object_or_404(response_object, pk=pk)
 
         if model.objects.filter(**filter_kwargs).exists():
@@ -68,11 +136,13 @@ class RecipeViewSet(viewsets.ModelViewSet):
             )
 
         model.objects.create(**filter_kwargs)
+        membership.refresh_on_commit(request.user.id)
         serializer = response_serializer(obj, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @staticmethod
-    def _remove_relation(request, pk, model, filter_kwargs, error_message):
+    def _remove_relation(request, pk, model, filter_kwargs, error_message,
+                         membership):
         relation = model.objects.filter(**filter_kwargs)
 
         if not relation.exists():
@@ -82,6 +152,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
             )
 
         relation.delete()
+        membership.refresh_on_commit(request.user.id)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
@@ -98,7 +169,8 @@ class RecipeViewSet(viewsets.ModelViewSet):
             filter_kwargs={'user': request.user, 'recipe_id': pk},
             response_serializer=RecipeMinifiedSerializer,
             response_object=Recipe,
-            error_message='Рецепт уже в избранном'
+            error_message='Рецепт уже в избранном',
+            membership=FAVORITES
         )
 
     @favorite.mapping.delete
@@ -109,7 +181,8 @@ class RecipeViewSet(viewsets.ModelViewSet):
             pk=pk,
             model=Favorite,
             filter_kwargs={'user': request.user, 'recipe_id': pk},
-            error_message='Рецепт не найден в избранном'
+            error_message='Рецепт не найден в избранном',
+            membership=FAVORITES
         )
 
     @action(
@@ -127,7 +200,8 @@ class RecipeViewSet(viewsets.ModelViewSet):
             filter_kwargs={'user': request.user, 'recipe_id': pk},
             response_serializer=RecipeMinifiedSerializer,
             response_object=Recipe,
-            error_message='Рецепт уже в списке покупок'
+            error_message='Рецепт уже в списке покупок',
+            membership=SHOPPING_CART
         )
 
     @shopping_cart.mapping.delete
@@ -138,7 +212,8 @@ class RecipeViewSet(viewsets.ModelViewSet):
             pk=pk,
             model=ShoppingCart,
             filter_kwargs={'user': request.user, 'recipe_id': pk},
-            error_message='Рецепт отсутствует в списке покупок'
+            error_message='Рецепт отсутствует в списке покупок',
+            membership=SHOPPING_CART
         )
 
     @action(
@@ -171,6 +246,139 @@ class RecipeViewSet(viewsets.ModelViewSet):
         )
         return response
 
+    @action(
+        detail=False,
+        methods=['get']
+    )
+    def batch(self, request):
+        raw_ids = [
+            value.strip()
+            for value in request.query_params.get('ids', '').split(',')
+            if value.strip()
+        ]
+        if not raw_ids:
+            return Response(
+                {'ids': 'Укажите id рецептов через запятую'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            ids = list(dict.fromkeys(int(value) for value in raw_ids))
+        except ValueError:
+            return Response(
+                {'ids': 'id рецептов должны быть целыми числами'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(ids) > RECIPES_BATCH_MAX_SIZE:
+            return Response(
+                {'ids': 'Можно запросить не более {} рецептов'.format(
+                    RECIPES_BATCH_MAX_SIZE
+                )},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        recipes = {
+            recipe.id: recipe
+            for recipe in self.get_queryset().filter(id__in=ids)
+        }
+        serializer = self.get_serializer(
+            [recipes[pk] for pk in ids if pk in recipes],
+            many=True
+        )
+        return Response({
+            'results': serializer.data,
+            'missing': [pk for pk in ids if pk not in recipes],
+        })
+
+    @action(
+        detail=False,
+        methods=['get']
+    )
+    def sync(self, request):
+        """
+        Изменения с момента updated_since. Клиент сначала применяет
+        deleted, затем остальные списки, и передаёт cursor в следующий
+        раз; при has_more сразу запрашивает продолжение.
+        """
+        now = timezone.now()
+        try:
+            since = parse_datetime(
+                request.query_params.get('updated_since', '')
+            )
+        except ValueError:
+            since = None
+        if since is None:
+            return Response(
+                {'updated_since': 'Укажите дату в формате ISO 8601'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        if since < now - timedelta(days=TOMBSTONE_RETENTION_DAYS):
+            return Response(
+                {'detail': 'Курсор устарел, нужна полная синхронизация'},
+                status=status.HTTP_410_GONE
+            )
+
+        # Время записи ставится до коммита: строки транзакций, которые
+        # ещё не закоммичены, попадут в следующий ответ за счёт запаса.
+        cursor = max(since, now - timedelta(seconds=SYNC_CURSOR_MARGIN))
+        recipes = self.get_queryset()
+        tombstones = Tombstone.objects.all()
+        favorites = Favorite.objects.none()
+        shopping_cart = ShoppingCart.objects.none()
+        if request.user.is_authenticated:
+            favorites = Favorite.objects.filter(user=request.user)
+            shopping_cart = ShoppingCart.objects.filter(user=request.user)
+            tombstones = tombstones.filter(
+                Q(user_id__isnull=True) | Q(user_id=request.user.id)
+            )
+        else:
+            tombstones = tombstones.filter(user_id__isnull=True)
+        sources = (
+            (recipes, 'updated_at'),
+            (favorites, 'created_at'),
+            (shopping_cart, 'added_at'),
+            (tombstones, 'deleted_at'),
+        )
+        cursor, has_more = get_sync_cursor(
+            sources, since, cursor, SYNC_PAGE_SIZE
+        )
+        recipes, favorites, shopping_cart, tombstones = (
+            queryset.filter(**{
+                f'{field}__gt': since, f'{field}__lte': cursor
+            }).order_by(field)
+            for queryset, field in sources
+        )
+
+        deleted = {kind: [] for kind, _ in Tombstone.KIND_CHOICES}
+        for kind, object_id in tombstones.values_list('kind', 'object_id'):
+            deleted[kind].append(object_id)
+        return Response({
+            'cursor': cursor.isoformat(),
+            'has_more': has_more,
+            'recipes': self.get_serializer(recipes, many=True).data,
+            'favorites': list(favorites.values_list('recipe_id', flat=True)),
+            'shopping_cart': list(
+                shopping_cart.values_list('recipe_id', flat=True)
+            ),
+            'deleted': deleted,
+        })
+
+    @action(
+        detail=False,
+        methods=['get']
+    )
+    def export(self, request):
+        """Весь каталог в NDJSON, отдаётся по мере чтения из базы."""
+        response = StreamingHttpResponse(
+            iter_ndjson(),
+            content_type='application/x-ndjson; charset=utf-8'
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="recipes.ndjson"'
+        )
+        return response
+
     @action(
         detail=True,
         methods=['get'],
@@ -0,0 +1,28 @@
+from asgiref.sync import sync_to_async
+from foodgram_backend.async_views import (Delegate, get_user,
+                                          get_values_serializer, json_response)
+
+from .fast_serializers import UserValuesSerializer
+from .models import User
+
+
+async def user_detail(request, pk):
+    viewer = await get_user(request)
+    serializer = get_values_serializer(UserValuesSerializer, request, viewer)
+    row = await User.objects.values(*serializer.fields).filter(pk=pk).afirst()
+    if row is None:
+        raise Delegate
+    data, = await sync_to_async(serializer.serialize)([row])
+    return json_response(data)
+
+
+async def user_me(request):
+    viewer = await get_user(request)
+    if viewer is None:
+        raise Delegate
+    serializer = get_values_serializer(UserValuesSerializer, request, viewer)
+    # Пользователь уже загружен: строка .values() без запроса к базе.
+    row = {field: getattr(viewer, field) for field in serializer.fields}
+    row['avatar'] = viewer.avatar.name
+    data, = await sync_to_async(serializer.serialize)([row])
+    return json_response(data)
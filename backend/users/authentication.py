@@ -0,0 +1,136 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import FileField
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .constants import (TOKEN_CACHE_TIMEOUT, TOKEN_LOCAL_CACHE_SIZE,
+                        TOKEN_LOCAL_CACHE_TIMEOUT)
+from .models import User
+
+# Хеш пароля в кеш не попадает: поле остаётся отложенным и
+# подгружается из базы только при проверке пароля.
+SNAPSHOT_FIELDS = [
+    field.attname for field in User._meta.concrete_fields
+    if field.attname != 'password'
+]
+# Для файловых полей хранится только имя файла: FieldFile ссылается на
+# пользователя целиком и при pickle утащил бы в кеш и пароль.
+SNAPSHOT_FILE_FIELDS = frozenset(
+    field.attname for field in User._meta.concrete_fields
+    if isinstance(field, FileField)
+)
+
+
+class LocalLRUCache:
+    """
+    Небольшой кеш внутри процесса. Время жизни записей короткое:
+    инвалидация в других воркерах доходит до него только по истечении
+    TOKEN_LOCAL_CACHE_TIMEOUT.
+    """
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+local_cache = LocalLRUCache(TOKEN_LOCAL_CACHE_SIZE, TOKEN_LOCAL_CACHE_TIMEOUT)
+
+
+def get_token_cache_key(key):
+    return 'auth:token:v2:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def invalidate_token(key):
+    """
+    Сбрасывает снимок после коммита, иначе параллельный запрос может
+    успеть закешировать ещё не изменённого пользователя или удалённый
+    токен.
+    """
+    cache_key = get_token_cache_key(key)
+
+    def delete():
+        local_cache.delete(cache_key)
+        cache.delete(cache_key)
+
+    transaction.on_commit(delete)
+
+
+def invalidate_user_tokens(user_id):
+    for key in Token.objects.filter(user_id=user_id).values_list(
+        'key', flat=True
+    ):
+        invalidate_token(key)
+
+
+def get_snapshot(user):
+    """Поля пользователя для кеша, только простые значения."""
+    snapshot = {}
+    for name in SNAPSHOT_FIELDS:
+        value = getattr(user, name)
+        if name in SNAPSHOT_FILE_FIELDS:
+            value = value.name
+        snapshot[name] = value
+    return snapshot
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication без запроса к БД на каждый вызов: токен
+    сопоставляется со снимком полей пользователя сначала в кеше
+    процесса, затем в общем кеше (только если он общий для всех
+    воркеров, см. CACHE_IS_SHARED). Снимок сбрасывается сигналами
+    при выходе, смене пароля, аватара и деактивации.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = get_token_cache_key(key)
+        snapshot = local_cache.get(cache_key)
+        if snapshot is None and settings.CACHE_IS_SHARED:
+            snapshot = cache.get(cache_key)
+            if snapshot is not None:
+                local_cache.set(cache_key, snapshot)
+        if snapshot is not None:
+            user = User.from_db(
+                'default', SNAPSHOT_FIELDS,
+                [snapshot[name] for name in SNAPSHOT_FIELDS]
+            )
+            return user, Token(key=key, user=user)
+
+        user, token = super().authenticate_credentials(key)
+        snapshot = get_snapshot(user)
+        if settings.CACHE_IS_SHARED:
+            cache.set(cache_key, snapshot, TOKEN_CACHE_TIMEOUT)
+        local_cache.set(cache_key, snapshot)
+        return user, token
@@ -1,3 +1,6 @@
 EMAIL_MAX_LENGTH = 254
 FIRST_NAME_MAX_LENGTH = 150
 LAST_NAME_MAX_LENGTH = 150
+TOKEN_CACHE_TIMEOUT = 300
+TOKEN_LOCAL_CACHE_SIZE = 1024
+TOKEN_LOCAL_CACHE_TIMEOUT = 10
@@ -0,0 +1,33 @@
+from foodgram_backend.fast_serializers import (ValuesSerializer,
+                                               media_url_getter)
+
+from .memberships import SUBSCRIPTIONS
+from .models import User
+
+
+class UserValuesSerializer(ValuesSerializer):
+    """То же, что UserSerializer, по строкам User.objects.values()."""
+
+    fields = ('email', 'id', 'username', 'first_name', 'last_name', 'avatar')
+
+    def __init__(self, request):
+        super().__init__(request)
+        self.avatar_url = media_url_getter(
+            request, User._meta.get_field('avatar')
+        )
+
+    def serialize(self, rows):
+        subscribed, = self.viewer_memberships(SUBSCRIPTIONS)
+        avatar_url = self.avatar_url
+        return [
+            {
+                'email': row['email'],
+                'id': row['id'],
+                'username': row['username'],
+                'first_name': row['first_name'],
+                'last_name': row['last_name'],
+                'is_subscribed': row['id'] in subscribed,
+                'avatar': avatar_url(row['avatar']),
+            }
+            for row in rows
+        ]
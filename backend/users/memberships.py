@@ -0,0 +1,5 @@
+from foodgram_backend.memberships import Membership
+
+from .models import Subscription
+
+SUBSCRIPTIONS = Membership('subscriptions', Subscription, 'author_id')
@@ -0,0 +1,22 @@
+# Generated by Django 5.0 on 2026-10-19 07:56
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции.
+    atomic = False
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='subscription',
+            index=models.Index(
+                fields=['author', 'user'],
+                name='subscription_author_user_idx'),
+        ),
+    ]
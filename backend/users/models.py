@@ -65,6 +65,12 @@ class Subscription(models.Model):
                 name='prevent_self_subscription'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['author', 'user'],
+                name='subscription_author_user_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.user} подписан на {self.author}'
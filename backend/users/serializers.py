@@ -3,9 +3,11 @@ from django.contrib.auth.password_validation import validate_password
 from django.db import transaction
 from djoser.serializers import TokenCreateSerializer
 from drf_extra_fields.fields import Base64ImageField
+from foodgram_backend.memberships import get_viewer_memberships
 from rest_framework import serializers
 
-from .models import Subscription, User
+from .memberships import SUBSCRIPTIONS
+from .models import User
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -27,13 +29,8 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
     def get_is_subscribed(self, obj):
-        request = self.context.get('request')
-        if not request or not request.user.is_authenticated:
-            return False
-        return Subscription.objects.filter(
-            user=request.user,
-            author=obj
-        ).exists()
+        subscriptions, = get_viewer_memberships(self.context, SUBSCRIPTIONS)
+        return obj.id in subscriptions
 
     def get_avatar(self, obj):
         if obj.avatar:
@@ -137,6 +134,7 @@ class UserWithRecipesSerializer(UserSerializer):
         fields = UserSerializer.Meta.fields + ('recipes', 'recipes_count')
 
     def get_recipes(self, obj):
+        # recipes.serializers импортирует UserSerializer из этого модуля.
         from recipes.serializers import RecipeMinifiedSerializer
         request = self.context.get('request')
         limit = request.query_params.get('recipes_limit') if request else None
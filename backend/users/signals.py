@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_token, invalidate_user_tokens
+from .memberships import SUBSCRIPTIONS
+from .models import Subscription, User
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_snapshot(sender, instance, created, **kwargs):
+    """Пароль, аватар, is_active и прочие поля снимка могли измениться."""
+    if not created:
+        invalidate_user_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def invalidate_subscriptions(sender, instance, **kwargs):
+    SUBSCRIPTIONS.invalidate(instance.user_id)
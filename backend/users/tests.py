@@ -0,0 +1,70 @@
+import pickle
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from .authentication import CachedTokenAuthentication, get_token_cache_key
+from .models import User
+
+
+@override_settings(CACHE_IS_SHARED=True)
+class CachedTokenAuthenticationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='cook@example.org',
+            username='cook',
+            first_name='Имя',
+            last_name='Фамилия',
+            password='Secret-pass-123',
+            avatar='users/avatar.png'
+        )
+        self.token = Token.objects.create(user=self.user)
+
+    def test_cached_snapshot_has_no_password(self):
+        CachedTokenAuthentication().authenticate_credentials(self.token.key)
+        snapshot = cache.get(get_token_cache_key(self.token.key))
+        payload = pickle.dumps(snapshot)
+        self.assertNotIn(b'password', payload)
+        self.assertNotIn(b'pbkdf2', payload)
+        self.assertNotIn(self.user.password.encode(), payload)
+        self.assertEqual(snapshot['avatar'], 'users/avatar.png')
+
+    def test_user_from_snapshot(self):
+        auth = CachedTokenAuthentication()
+        auth.authenticate_credentials(self.token.key)
+        user, _ = auth.authenticate_credentials(self.token.key)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.avatar.name, 'users/avatar.png')
+        self.assertTrue(user.check_password('Secret-pass-123'))
+
+    @override_settings(CACHE_IS_SHARED=False)
+    def test_process_local_cache_is_not_used_as_shared(self):
+        CachedTokenAuthentication().authenticate_credentials(self.token.key)
+        self.assertIsNone(cache.get(get_token_cache_key(self.token.key)))
+
+    def test_snapshot_dropped_after_commit(self):
+        auth = CachedTokenAuthentication()
+        auth.authenticate_credentials(self.token.key)
+        cache_key = get_token_cache_key(self.token.key)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+            # До коммита параллельный запрос мог бы закешировать
+            # старый снимок, поэтому сброс откладывается.
+            self.assertIsNotNone(cache.get(cache_key))
+        self.assertIsNone(cache.get(cache_key))
+        with self.assertRaises(AuthenticationFailed):
+            auth.authenticate_credentials(self.token.key)
+
+    def test_deleted_token_dropped_after_commit(self):
+        auth = CachedTokenAuthentication()
+        key = self.token.key
+        auth.authenticate_credentials(key)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+        with self.assertRaises(AuthenticationFailed):
+            auth.authenticate_credentials(key)
@@ -1,6 +1,9 @@
+from django.conf import settings
 from django.urls import include, path
+from foodgram_backend.async_views import async_get, get_router_views
 from rest_framework.routers import DefaultRouter
 
+from . import async_views
 from .views import UserViewSet
 
 router = DefaultRouter()
@@ -9,3 +12,18 @@ router.register('', UserViewSet, basename='users')
 urlpatterns = [
     path('', include(router.urls)),
 ]
+
+if settings.ASYNC_READ_VIEWS:
+    views = get_router_views(router)
+    urlpatterns = [
+        path(
+            'me/',
+            async_get(async_views.user_me, views['users-me']),
+            name='users-me'
+        ),
+        path(
+            '<int:pk>/',
+            async_get(async_views.user_detail, views['users-detail']),
+            name='users-detail'
+        ),
+    ] + urlpatterns
@@ -1,20 +1,35 @@
 from django.db import transaction
 from django.db.models import Count
 from django.shortcuts import get_object_or_404
+from foodgram_backend.mixins import (SparseFieldsMixin, ValuesReadMixin,
+                                     ViewerMembershipsMixin)
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
+from .fast_serializers import UserValuesSerializer
+from .memberships import SUBSCRIPTIONS
 from .models import Subscription, User
 from .serializers import (CustomUserCreateSerializer, SetAvatarSerializer,
                           SetPasswordSerializer, UserSerializer,
                           UserWithRecipesSerializer)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsMixin, ValuesReadMixin, ViewerMembershipsMixin,
+                  viewsets.ModelViewSet):
     queryset = User.objects.all()
     permission_classes = [AllowAny]
+    values_serializer_class = UserValuesSerializer
+    viewer_memberships = (SUBSCRIPTIONS,)
+    sparse_fields_actions = ('list', 'retrieve', 'me')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            queryset = self.defer_sparse_fields(queryset, fields)
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -104,7 +119,7 @@ class UserViewSet(viewsets.ModelViewSet):
                 page,
                 many=True,
                 context={
-                    'request': request,
+                    **self.get_serializer_context(),
                     'recipes_limit': limit
                 }
             )
@@ -113,7 +128,7 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = UserWithRecipesSerializer(
             subs,
             many=True,
-            context={'request': request}
+            context=self.get_serializer_context()
         )
         return Response(serializer.data)
 
@@ -140,9 +155,10 @@ class UserViewSet(viewsets.ModelViewSet):
                     {'errors': 'Вы уже подписаны на этого пользователя'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
+            SUBSCRIPTIONS.refresh_on_commit(request.user.id)
             serializer = UserWithRecipesSerializer(
                 author,
-                context={'request': request}
+                context=self.get_serializer_context()
             )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -157,4 +173,5 @@ class UserViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             sub.delete()
+            SUBSCRIPTIONS.refresh_on_commit(request.user.id)
             return Response(status=status.HTTP_204_NO_CONTENT)